@@ -6,14 +6,170 @@ This version is for laptop use - data can be migrated to MySQL later
 
 import sqlite3
 import json
+import logging
 import os
-from datetime import datetime
+import queue
+import shutil
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from dotenv import load_dotenv
-from typing import Optional, Dict, List
+from typing import Iterator, Optional, Dict, List
+
+# Per-row status messages go to DEBUG with lazy %s formatting so bulk inserts
+# don't pay a string build + synchronous stdout write for every single row
+logger = logging.getLogger(__name__)
+
+# Prefer orjson for serializing evaluation lists / API payloads - its C
+# encoder is several times faster than stdlib json on the small structures
+# stored per row. Falls back to stdlib json when orjson isn't installed.
+try:
+    import orjson
+
+    def _json_dumps(value):
+        return orjson.dumps(value).decode()
+except ImportError:
+    def _json_dumps(value):
+        return json.dumps(value)
+
+
+# SQL for the hot-path helpers, kept as module constants so each call sends
+# byte-identical text to SQLite and hits the connection's statement cache
+# instead of re-parsing/re-planning the query.
+_Q_INSERT_PROMPT = """
+    INSERT INTO generated_prompts
+    (session_id, theme, prompt_text, prompt_type, approach_type,
+     variation_style, file_name, file_path, character_count)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_Q_INSERT_EVALUATION = """
+    INSERT INTO prompt_evaluations
+    (prompt_id, session_id, iteration_number, original_prompt, refined_prompt,
+     evaluation_score, feedback, missing_elements, strength_areas,
+     processing_time_seconds, approved, approved_file_path)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_Q_INSERT_REFORMATTED = """
+    INSERT INTO reformatted_prompts
+    (evaluation_id, prompt_id, session_id, original_detailed_prompt,
+     generator_optimized_prompt, character_count_before, character_count_after,
+     compression_ratio, file_name, file_path)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_Q_INSERT_IMAGE = """
+    INSERT INTO generated_images
+    (reformatted_id, prompt_id, session_id, generator_task_id, image_file_name,
+     image_file_path, generator_prompt_used, generation_status)
+    VALUES (?, ?, ?, ?, ?, ?, ?, 'pending')
+"""
+
+_Q_INSERT_IMAGE_PAYLOAD = """
+    INSERT OR REPLACE INTO generated_images_payloads (image_id, api_response)
+    VALUES (?, ?)
+"""
+
+_Q_GET_IMAGE_PAYLOAD = """
+    SELECT api_response FROM generated_images_payloads WHERE image_id = ?
+"""
+
+_Q_SET_IMAGE_TASK_ID = """
+    UPDATE generated_images SET generator_task_id = ? WHERE image_id = ?
+"""
+
+_Q_UPDATE_IMAGE_STATUS = """
+    UPDATE generated_images
+    SET generation_status = ?,
+        generation_timestamp = CURRENT_TIMESTAMP,
+        image_url = ?,
+        file_size_bytes = ?,
+        image_width = ?,
+        image_height = ?,
+        error_message = ?
+    WHERE image_id = ?
+"""
+
+_Q_GET_SESSION_PROMPTS = """
+    SELECT * FROM generated_prompts
+    WHERE session_id = ?
+    ORDER BY created_at
+"""
+
+# Fixed-shape session update: COALESCE keeps a column unchanged when its
+# parameter is NULL, so one cached statement covers every kwargs combination
+# instead of rebuilding (and re-planning) the SET clause per call
+_Q_UPDATE_SESSION_STATUS = """
+    UPDATE pipeline_sessions
+    SET total_prompts_generated = COALESCE(?, total_prompts_generated),
+        total_prompts_approved = COALESCE(?, total_prompts_approved),
+        total_images_generated = COALESCE(?, total_images_generated),
+        base_output_dir = COALESCE(?, base_output_dir),
+        theme = COALESCE(?, theme),
+        status = ?,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE session_id = ?
+"""
+
+# Column order must match the COALESCE placeholders above
+_SESSION_UPDATE_COLUMNS = (
+    'total_prompts_generated', 'total_prompts_approved',
+    'total_images_generated', 'base_output_dir', 'theme'
+)
+
+_Q_GET_SESSION = "SELECT * FROM pipeline_sessions WHERE session_id = ?"
+
+_Q_SESSION_FLOW = """
+    SELECT COUNT(DISTINCT gp.prompt_id) as total_prompts,
+           COUNT(DISTINCT CASE WHEN pe.approved = 1 THEN pe.prompt_id END) as approved_prompts,
+           COUNT(DISTINCT rp.reformatted_id) as reformatted_prompts,
+           COUNT(DISTINCT gi.image_id) as total_images,
+           COUNT(DISTINCT CASE WHEN gi.generation_status = 'completed' THEN gi.image_id END) as successful_images
+    FROM pipeline_sessions ps
+    LEFT JOIN generated_prompts gp ON ps.session_id = gp.session_id
+    LEFT JOIN prompt_evaluations pe ON gp.prompt_id = pe.prompt_id
+    LEFT JOIN reformatted_prompts rp ON pe.evaluation_id = rp.evaluation_id
+    LEFT JOIN generated_images gi ON rp.reformatted_id = gi.reformatted_id
+    WHERE ps.session_id = ?
+"""
 
-# Load environment variables
-load_dotenv()
+
+# Bump this when migrate_schema() gains a new migration step
+_SCHEMA_VERSION = 2
+
+# Process-wide pool of warmed connection pairs keyed by database path.
+# Pipeline stages wrap each step in `with DatabaseManager() as db:`, which
+# used to pay the full reconnect + CREATE TABLE + migration cost every time;
+# pooled connections keep their PRAGMAs and verified schema between stages.
+# Each entry is a (writer, reader) pair so WAL readers can run concurrently.
+# In-memory databases are never pooled (each connection is its own database).
+_CONNECTION_POOL: Dict[str, queue.Queue] = {}
+_POOL_LOCK = threading.Lock()
+
+
+def _acquire_pooled_connections(db_path: str) -> Optional[tuple]:
+    """Get a warmed (writer, reader) pair for db_path, or None on pool miss"""
+    if db_path == ":memory:":
+        return None
+    with _POOL_LOCK:
+        pool = _CONNECTION_POOL.get(db_path)
+    if pool is None:
+        return None
+    try:
+        return pool.get_nowait()
+    except queue.Empty:
+        return None
+
+
+def _release_pooled_connections(db_path: str, writer: sqlite3.Connection,
+                                reader: Optional[sqlite3.Connection]):
+    """Return a (writer, reader) pair to the pool for later reuse"""
+    if db_path == ":memory:":
+        writer.close()
+        return
+    with _POOL_LOCK:
+        pool = _CONNECTION_POOL.setdefault(db_path, queue.Queue())
+    pool.put((writer, reader))
 
 
 class DatabaseManager:
@@ -21,28 +177,94 @@ class DatabaseManager:
 
     def __init__(self, db_path: str = None):
         if db_path is None:
-            # Create database in project root
+            # Create database in project root. The runtime database is
+            # gitignored; a fresh checkout is seeded from the tracked
+            # sample so connect-time writes (WAL header, user_version,
+            # planner statistics) never land on a tracked file
             project_root = Path(__file__).parent.parent
             db_path = project_root / "image_pipeline.db"
+            sample_db = project_root / "image_pipeline.sample.db"
+            if not db_path.exists() and sample_db.exists():
+                shutil.copyfile(sample_db, db_path)
+                logger.info("Seeded runtime database from sample: %s", db_path)
         
         self.db_path = str(db_path)
         self.connection = None
         self.cursor = None
+        self._explicit_transaction = False
+        self._from_pool = False
+        # Serializes writers; reads go through a second connection so WAL can
+        # run them concurrently with inserts/updates
+        self._write_lock = threading.RLock()
+        self._read_conn = None
+        self._read_cursor = None
+        # Column-name tuples for get_session_summary, captured on first use
+        # so repeated dashboard refreshes skip the Row.keys() lookup
+        self._session_columns = None
+        self._flow_columns = None
         self.connect()
-        self.create_tables()
-        self.migrate_schema()  # Apply schema migrations for existing databases
+        if not self._from_pool:
+            # Pooled connections already have a verified, migrated schema
+            self.create_tables()
+            self.migrate_schema()  # Apply schema migrations for existing databases
 
     def connect(self):
-        """Establish database connection"""
+        """Establish database connections, reusing pooled ones when available"""
         try:
-            self.connection = sqlite3.connect(self.db_path)
+            pooled = _acquire_pooled_connections(self.db_path)
+            if pooled is not None:
+                self.connection, self._read_conn = pooled
+                self._from_pool = True
+                self.cursor = self.connection.cursor()
+                if self._read_conn is not None:
+                    self._read_cursor = self._read_conn.cursor()
+                return
+
+            # Writer connection - all insert/update methods go through this,
+            # guarded by self._write_lock
+            self.connection = sqlite3.connect(self.db_path, cached_statements=256,
+                                              check_same_thread=False)
             self.connection.row_factory = sqlite3.Row  # Makes rows dict-like
+            self._apply_pragmas(self.connection)
             self.cursor = self.connection.cursor()
-            print(f"[SUCCESS] SQLite database connected: {self.db_path}")
+
+            # Separate reader connection so get_prompts_for_session and
+            # get_session_summary don't queue behind writers under WAL.
+            # An in-memory database is private per connection, so fall back
+            # to the single shared connection there.
+            if self.db_path != ":memory:":
+                self._read_conn = sqlite3.connect(self.db_path, cached_statements=256,
+                                                  check_same_thread=False)
+                self._read_conn.row_factory = sqlite3.Row
+                self._apply_pragmas(self._read_conn)
+                self._read_cursor = self._read_conn.cursor()
+            else:
+                self._read_conn = None
+                self._read_cursor = self.cursor
+
+            logger.debug("SQLite database connected: %s", self.db_path)
         except sqlite3.Error as e:
-            print(f"[ERROR] Database connection failed: {e}")
+            logger.error("Database connection failed: %s", e)
             raise
 
+    def _apply_pragmas(self, connection):
+        """
+        Tune a connection for the write-heavy pipeline workload.
+
+        WAL mode with synchronous=NORMAL cuts the fsyncs per commit and lets
+        readers (e.g. get_session_summary) run while the pipeline is writing.
+        Trade-off: WAL defers some write cost to checkpoints, so keep the
+        autocheckpoint interval at a moderate 1000 pages.
+        """
+        if self.db_path != ":memory:":
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA wal_autocheckpoint=1000")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA temp_store=MEMORY")
+        connection.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+        connection.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+        connection.execute("PRAGMA busy_timeout=5000")
+
     def create_tables(self):
         """Create all necessary tables"""
         try:
@@ -136,7 +358,6 @@ class DatabaseManager:
                     image_file_name TEXT,
                     image_file_path TEXT,
                     generator_prompt_used TEXT,
-                    api_response TEXT,
                     generation_status TEXT DEFAULT 'pending',
                     generation_timestamp DATETIME,
                     image_url TEXT,
@@ -151,16 +372,60 @@ class DatabaseManager:
                 )
             """)
 
+            # Raw API payloads live in a side table so the hot
+            # generated_images rows stay narrow - get_session_summary's COUNT
+            # join never needs the multi-KB response blobs and shouldn't drag
+            # them through the page cache
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS generated_images_payloads (
+                    image_id INTEGER PRIMARY KEY,
+                    api_response TEXT,
+                    FOREIGN KEY (image_id) REFERENCES generated_images(image_id)
+                )
+            """)
+
+            # Indices for the get_session_summary join chain - without these
+            # SQLite full-scans each child table, since only the primary keys
+            # are indexed by default
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_gp_session
+                ON generated_prompts(session_id)
+            """)
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_pe_prompt
+                ON prompt_evaluations(prompt_id)
+            """)
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_rp_eval
+                ON reformatted_prompts(evaluation_id)
+            """)
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_gi_reformatted
+                ON generated_images(reformatted_id)
+            """)
+            # Covering index for the COUNT(CASE WHEN generation_status = ...)
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_gi_status
+                ON generated_images(reformatted_id, generation_status)
+            """)
+
             self.connection.commit()
-            print("[SUCCESS] Database tables created/verified")
+            logger.debug("Database tables created/verified")
 
         except sqlite3.Error as e:
-            print(f"[ERROR] Failed to create tables: {e}")
+            logger.error("Failed to create tables: %s", e)
             raise
 
     def migrate_schema(self):
         """Add missing columns to existing tables (for schema updates)"""
         try:
+            # Versioned migration: once a database is stamped with the current
+            # schema version we can skip the PRAGMA table_info scan entirely,
+            # which otherwise runs on every DatabaseManager construction
+            current_version = self.cursor.execute("PRAGMA user_version").fetchone()[0]
+            if current_version >= _SCHEMA_VERSION:
+                return
+
             # Check and add status column to generated_prompts if missing
             self.cursor.execute("PRAGMA table_info(generated_prompts)")
             columns = [row[1] for row in self.cursor.fetchall()]
@@ -169,26 +434,73 @@ class DatabaseManager:
                 self.cursor.execute("""
                     ALTER TABLE generated_prompts ADD COLUMN status TEXT DEFAULT 'pending'
                 """)
-                print("[MIGRATION] Added 'status' column to generated_prompts table")
+                logger.info("Added 'status' column to generated_prompts table")
 
             if 'updated_at' not in columns:
                 self.cursor.execute("""
                     ALTER TABLE generated_prompts ADD COLUMN updated_at DATETIME DEFAULT NULL
                 """)
-                print("[MIGRATION] Added 'updated_at' column to generated_prompts table")
+                logger.info("Added 'updated_at' column to generated_prompts table")
 
+            # Refresh planner statistics so the indices created at this
+            # schema version actually get used. ANALYZE scans every table,
+            # so it runs only here - once per version bump - instead of on
+            # every connect
+            self.cursor.execute("ANALYZE")
+
+            # Stamp the database so future startups can early-exit
+            self.cursor.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
             self.connection.commit()
 
         except sqlite3.Error as e:
-            print(f"[WARNING] Schema migration failed: {e}")
+            logger.warning("Schema migration failed: %s", e)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group multiple insert/update calls into a single transaction.
+
+        Each insert helper normally commits its own row, which costs one
+        fsync per row. Wrapping a burst of calls in `with db.transaction():`
+        defers the commit (and its fsync) to the end of the block:
+
+            with db.transaction():
+                for prompt in prompts:
+                    db.insert_generated_prompt(...)
+        """
+        with self._write_lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            self._explicit_transaction = True
+            try:
+                yield self
+                self.connection.commit()
+            except Exception:
+                self.connection.rollback()
+                raise
+            finally:
+                self._explicit_transaction = False
+
+    def _maybe_commit(self):
+        """Commit unless we're inside an explicit transaction() block"""
+        if not self._explicit_transaction:
+            self.connection.commit()
 
     def disconnect(self):
-        """Close database connection"""
+        """Release the connections back to the pool for reuse"""
         if self.cursor:
             self.cursor.close()
+            self.cursor = None
+        if self._read_cursor is not None and self._read_conn is not None:
+            self._read_cursor.close()
+        self._read_cursor = None
         if self.connection:
-            self.connection.close()
-        print("[LIST] Database connection closed")
+            # Never pool a connection with an open transaction
+            if self.connection.in_transaction:
+                self.connection.rollback()
+            _release_pooled_connections(self.db_path, self.connection, self._read_conn)
+            self.connection = None
+            self._read_conn = None
+        logger.debug("Database connection closed")
 
     def __enter__(self):
         return self
@@ -203,17 +515,20 @@ class DatabaseManager:
     def create_pipeline_session(self, session_id: str, theme: str, base_output_dir: str) -> bool:
         """Create a new pipeline session"""
         try:
+            # Timestamps are computed server-side: CURRENT_TIMESTAMP avoids
+            # allocating a datetime and adapter-formatting it per call
             query = """
                 INSERT INTO pipeline_sessions
                 (session_id, theme, session_timestamp, base_output_dir, status)
-                VALUES (?, ?, ?, ?, 'running')
+                VALUES (?, ?, CURRENT_TIMESTAMP, ?, 'running')
             """
-            self.cursor.execute(query, (session_id, theme, datetime.now(), base_output_dir))
-            self.connection.commit()
-            print(f"[SUCCESS] Created pipeline session: {session_id}")
+            with self._write_lock:
+                self.cursor.execute(query, (session_id, theme, base_output_dir))
+                self._maybe_commit()
+            logger.debug("Created pipeline session: %s", session_id)
             return True
         except sqlite3.Error as e:
-            print(f"[ERROR] Failed to create pipeline session: {e}")
+            logger.error("Failed to create pipeline session: %s", e)
             return False
 
     def update_pipeline_session_status(self, session_id: str, status: str, **kwargs) -> bool:
@@ -223,39 +538,23 @@ class DatabaseManager:
         Security: Uses whitelist to prevent SQL injection via dynamic column names
         """
         try:
-            # SECURITY: Whitelist of allowed column names to prevent SQL injection
-            ALLOWED_COLUMNS = {
-                'total_prompts_generated', 'total_prompts_approved',
-                'total_images_generated',
-                'base_output_dir', 'theme'
-            }
-
-            # Filter kwargs to only allowed columns
-            safe_kwargs = {k: v for k, v in kwargs.items() if k in ALLOWED_COLUMNS}
-
-            # Warn if any columns were rejected
-            rejected = set(kwargs.keys()) - ALLOWED_COLUMNS
+            # Warn if any columns were rejected (also prevents SQL injection,
+            # since unknown kwargs never reach the fixed statement)
+            rejected = set(kwargs.keys()) - set(_SESSION_UPDATE_COLUMNS)
             if rejected:
-                print(f"[SECURITY WARNING] Rejected unsafe column names: {rejected}")
-
-            # Build query with validated column names
-            update_fields = [f"{key} = ?" for key in safe_kwargs.keys()]
-            update_fields.append("status = ?")
-            update_fields.append("updated_at = ?")
-
-            query = f"""
-                UPDATE pipeline_sessions
-                SET {', '.join(update_fields)}
-                WHERE session_id = ?
-            """
-
-            values = list(safe_kwargs.values()) + [status, datetime.now(), session_id]
-            self.cursor.execute(query, values)
-            self.connection.commit()
-            print(f"[SUCCESS] Updated session {session_id} status to: {status}")
+                logger.warning("Rejected unsafe column names: %s", rejected)
+
+            # Fixed parameter order; missing kwargs become NULL, which
+            # COALESCE turns into "keep the current value"
+            values = [kwargs.get(col) for col in _SESSION_UPDATE_COLUMNS]
+            values += [status, session_id]
+            with self._write_lock:
+                self.cursor.execute(_Q_UPDATE_SESSION_STATUS, values)
+                self._maybe_commit()
+            logger.debug("Updated session %s status to: %s", session_id, status)
             return True
         except sqlite3.Error as e:
-            print(f"[ERROR] Failed to update session status: {e}")
+            logger.error("Failed to update session status: %s", e)
             return False
 
     # =============================================================================
@@ -264,41 +563,51 @@ class DatabaseManager:
 
     def insert_generated_prompt(self, session_id: str, theme: str, prompt_text: str,
                                 prompt_type: str, approach_type: str, variation_style: str,
-                                file_name: str, file_path: str) -> Optional[int]:
-        """Insert a generated prompt into the database"""
+                                file_name: str, file_path: str,
+                                character_count: int = None) -> Optional[int]:
+        """
+        Insert a generated prompt into the database
+
+        Pass character_count when the caller already knows the prompt length
+        to skip a redundant O(n) walk over long prompt strings.
+        """
         try:
-            query = """
-                INSERT INTO generated_prompts
-                (session_id, theme, prompt_text, prompt_type, approach_type,
-                 variation_style, file_name, file_path, character_count)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
+            if character_count is None:
+                character_count = len(prompt_text)
             values = (session_id, theme, prompt_text, prompt_type, approach_type,
-                      variation_style, file_name, file_path, len(prompt_text))
+                      variation_style, file_name, file_path, character_count)
 
-            self.cursor.execute(query, values)
-            self.connection.commit()
-            prompt_id = self.cursor.lastrowid
-            print(f"[SUCCESS] Inserted prompt {prompt_id}: {file_name}")
+            with self._write_lock:
+                self.cursor.execute(_Q_INSERT_PROMPT, values)
+                self._maybe_commit()
+                prompt_id = self.cursor.lastrowid
+            logger.debug("Inserted prompt %s: %s", prompt_id, file_name)
             return prompt_id
         except sqlite3.Error as e:
-            print(f"[ERROR] Failed to insert prompt: {e}")
+            logger.error("Failed to insert prompt: %s", e)
             return None
 
-    def get_prompts_for_session(self, session_id: str) -> List[Dict]:
-        """Get all prompts for a session"""
+    def get_prompts_for_session(self, session_id: str) -> Iterator[Dict]:
+        """
+        Get all prompts for a session as a lazy iterator.
+
+        Rows are yielded straight off the cursor instead of materializing
+        fetchall() plus a second list of dicts - large sessions no longer
+        hold two full copies of the result set in memory. Callers that need
+        random access can wrap the result in list().
+        """
         try:
-            query = """
-                SELECT * FROM generated_prompts
-                WHERE session_id = ?
-                ORDER BY created_at
-            """
-            self.cursor.execute(query, (session_id,))
-            rows = self.cursor.fetchall()
-            return [dict(row) for row in rows]
+            # A dedicated cursor keeps the stream independent of other
+            # reads on this manager - the shared read cursor would be
+            # re-executed out from under an in-progress iteration by e.g.
+            # a get_session_summary call
+            read_conn = self._read_conn if self._read_conn is not None else self.connection
+            cursor = read_conn.cursor()
+            cursor.execute(_Q_GET_SESSION_PROMPTS, (session_id,))
+            return (dict(row) for row in cursor)
         except sqlite3.Error as e:
-            print(f"[ERROR] Failed to get prompts: {e}")
-            return []
+            logger.error("Failed to get prompts: %s", e)
+            return iter(())
 
     def insert_prompt_evaluation(self, prompt_id: int, session_id: str, iteration_number: int,
                                  original_prompt: str, refined_prompt: str, evaluation_score: str,
@@ -306,56 +615,122 @@ class DatabaseManager:
                                  processing_time: float, approved: bool, approved_file_path: str = None) -> Optional[int]:
         """Insert prompt evaluation result"""
         try:
-            query = """
-                INSERT INTO prompt_evaluations
-                (prompt_id, session_id, iteration_number, original_prompt, refined_prompt,
-                 evaluation_score, feedback, missing_elements, strength_areas,
-                 processing_time_seconds, approved, approved_file_path)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
             values = (prompt_id, session_id, iteration_number, original_prompt, refined_prompt,
-                      evaluation_score, feedback, json.dumps(missing_elements),
-                      json.dumps(strength_areas), processing_time, approved, approved_file_path)
-
-            self.cursor.execute(query, values)
-            self.connection.commit()
-            evaluation_id = self.cursor.lastrowid
-            print(f"[SUCCESS] Inserted evaluation {evaluation_id} for prompt {prompt_id}")
+                      evaluation_score, feedback, _json_dumps(missing_elements),
+                      _json_dumps(strength_areas), processing_time, approved, approved_file_path)
+
+            with self._write_lock:
+                self.cursor.execute(_Q_INSERT_EVALUATION, values)
+                self._maybe_commit()
+                evaluation_id = self.cursor.lastrowid
+            logger.debug("Inserted evaluation %s for prompt %s", evaluation_id, prompt_id)
             return evaluation_id
         except sqlite3.Error as e:
-            print(f"[ERROR] Failed to insert evaluation: {e}")
+            logger.error("Failed to insert evaluation: %s", e)
             return None
 
+    def bulk_insert_generated_prompts(self, rows: List[tuple]) -> int:
+        """
+        Insert many generated prompts with a single commit.
+
+        Each row is (session_id, theme, prompt_text, prompt_type, approach_type,
+        variation_style, file_name, file_path, character_count). Amortizes the
+        per-commit fsync across the whole batch.
+        """
+        if not rows:
+            return 0
+        try:
+            with self._write_lock:
+                self.cursor.executemany(_Q_INSERT_PROMPT, rows)
+                self._maybe_commit()
+            logger.debug("Bulk inserted %d prompts", len(rows))
+            return len(rows)
+        except sqlite3.Error as e:
+            logger.error("Failed to bulk insert prompts: %s", e)
+            return 0
+
+    def bulk_insert_generated_images(self, rows: List[tuple]) -> int:
+        """
+        Insert many generated image records with a single commit.
+
+        Each row is (reformatted_id, prompt_id, session_id, generator_task_id,
+        image_file_name, image_file_path, generator_prompt_used). API payloads
+        are stored separately via insert_generated_image.
+        """
+        if not rows:
+            return 0
+        try:
+            with self._write_lock:
+                self.cursor.executemany(_Q_INSERT_IMAGE, rows)
+                self._maybe_commit()
+            logger.debug("Bulk inserted %d image records", len(rows))
+            return len(rows)
+        except sqlite3.Error as e:
+            logger.error("Failed to bulk insert image records: %s", e)
+            return 0
+
+    def commit_session_results(self, session_id: str, prompts: List[tuple] = None,
+                               evaluations: List[tuple] = None,
+                               reformatted: List[tuple] = None,
+                               images: List[tuple] = None) -> bool:
+        """
+        Persist a whole pipeline stage's results in one transaction.
+
+        Takes pre-built parameter tuples matching the insert helpers' column
+        order and issues one executemany per table inside a single
+        BEGIN IMMEDIATE / COMMIT - a burst of N rows costs one fsync instead
+        of N. session_id is only used for the status message; the rows carry
+        their own session column.
+        """
+        try:
+            with self.transaction():
+                if prompts:
+                    self.cursor.executemany(_Q_INSERT_PROMPT, prompts)
+                if evaluations:
+                    self.cursor.executemany(_Q_INSERT_EVALUATION, evaluations)
+                if reformatted:
+                    self.cursor.executemany(_Q_INSERT_REFORMATTED, reformatted)
+                if images:
+                    self.cursor.executemany(_Q_INSERT_IMAGE, images)
+            total = sum(len(rows) for rows in (prompts, evaluations, reformatted, images) if rows)
+            logger.debug("Committed %d rows for session %s", total, session_id)
+            return True
+        except sqlite3.Error as e:
+            logger.error("Failed to commit session results: %s", e)
+            return False
+
     # =============================================================================
     # REFORMATTED PROMPTS
     # =============================================================================
 
     def insert_reformatted_prompt(self, evaluation_id: int, prompt_id: int, session_id: str,
                                   original_detailed: str, generator_optimized: str,
-                                  file_name: str, file_path: str) -> Optional[int]:
-        """Insert reformatted prompt"""
+                                  file_name: str, file_path: str,
+                                  char_before: int = None, char_after: int = None) -> Optional[int]:
+        """
+        Insert reformatted prompt
+
+        char_before/char_after may be supplied by callers that already
+        measured the prompts, avoiding a second length walk here.
+        """
         try:
-            char_before = len(original_detailed)
-            char_after = len(generator_optimized)
+            if char_before is None:
+                char_before = len(original_detailed)
+            if char_after is None:
+                char_after = len(generator_optimized)
             compression_ratio = char_after / char_before if char_before > 0 else 0
 
-            query = """
-                INSERT INTO reformatted_prompts
-                (evaluation_id, prompt_id, session_id, original_detailed_prompt,
-                 generator_optimized_prompt, character_count_before, character_count_after,
-                 compression_ratio, file_name, file_path)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
             values = (evaluation_id, prompt_id, session_id, original_detailed, generator_optimized,
                       char_before, char_after, compression_ratio, file_name, file_path)
 
-            self.cursor.execute(query, values)
-            self.connection.commit()
-            reformatted_id = self.cursor.lastrowid
-            print(f"[SUCCESS] Inserted reformatted prompt {reformatted_id}")
+            with self._write_lock:
+                self.cursor.execute(_Q_INSERT_REFORMATTED, values)
+                self._maybe_commit()
+                reformatted_id = self.cursor.lastrowid
+            logger.debug("Inserted reformatted prompt %s", reformatted_id)
             return reformatted_id
         except sqlite3.Error as e:
-            print(f"[ERROR] Failed to insert reformatted prompt: {e}")
+            logger.error("Failed to insert reformatted prompt: %s", e)
             return None
 
     # =============================================================================
@@ -367,22 +742,48 @@ class DatabaseManager:
                                generator_prompt: str, api_response: Dict = None) -> Optional[int]:
         """Insert generated image record"""
         try:
-            query = """
-                INSERT INTO generated_images
-                (reformatted_id, prompt_id, session_id, generator_task_id, image_file_name,
-                 image_file_path, generator_prompt_used, api_response, generation_status)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending')
-            """
             values = (reformatted_id, prompt_id, session_id, generator_task_id, image_file_name,
-                      image_file_path, generator_prompt, json.dumps(api_response) if api_response else None)
-
-            self.cursor.execute(query, values)
-            self.connection.commit()
-            image_id = self.cursor.lastrowid
-            print(f"[SUCCESS] Inserted image record {image_id}")
+                      image_file_path, generator_prompt)
+
+            with self._write_lock:
+                self.cursor.execute(_Q_INSERT_IMAGE, values)
+                image_id = self.cursor.lastrowid
+                # Payload goes to the side table, only when one was supplied
+                if api_response:
+                    self.cursor.execute(_Q_INSERT_IMAGE_PAYLOAD,
+                                        (image_id, _json_dumps(api_response)))
+                self._maybe_commit()
+            logger.debug("Inserted image record %s", image_id)
             return image_id
         except sqlite3.Error as e:
-            print(f"[ERROR] Failed to insert image record: {e}")
+            logger.error("Failed to insert image record: %s", e)
+            return None
+
+    def set_image_task_id(self, image_id: int, task_id: str,
+                          api_response: Dict = None) -> bool:
+        """Record the generator task id for an image, with optional raw payload"""
+        try:
+            with self._write_lock:
+                self.cursor.execute(_Q_SET_IMAGE_TASK_ID, (task_id, image_id))
+                # Payload goes to the side table, only when one was supplied
+                if api_response:
+                    self.cursor.execute(_Q_INSERT_IMAGE_PAYLOAD,
+                                        (image_id, _json_dumps(api_response)))
+                self._maybe_commit()
+            logger.debug("Updated image %s task id to: %s", image_id, task_id)
+            return True
+        except sqlite3.Error as e:
+            logger.error("Failed to update image task id: %s", e)
+            return False
+
+    def get_image_api_response(self, image_id: int) -> Optional[str]:
+        """Get the stored raw API response for an image, if any"""
+        try:
+            self._read_cursor.execute(_Q_GET_IMAGE_PAYLOAD, (image_id,))
+            row = self._read_cursor.fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            logger.error("Failed to get image payload: %s", e)
             return None
 
     def update_image_generation_status(self, image_id: int, status: str, image_url: str = None,
@@ -390,24 +791,14 @@ class DatabaseManager:
                                        error_message: str = None) -> bool:
         """Update image generation status"""
         try:
-            query = """
-                UPDATE generated_images
-                SET generation_status = ?,
-                    generation_timestamp = ?,
-                    image_url = ?,
-                    file_size_bytes = ?,
-                    image_width = ?,
-                    image_height = ?,
-                    error_message = ?
-                WHERE image_id = ?
-            """
-            values = (status, datetime.now(), image_url, file_size, width, height, error_message, image_id)
-            self.cursor.execute(query, values)
-            self.connection.commit()
-            print(f"[SUCCESS] Updated image {image_id} status to: {status}")
+            values = (status, image_url, file_size, width, height, error_message, image_id)
+            with self._write_lock:
+                self.cursor.execute(_Q_UPDATE_IMAGE_STATUS, values)
+                self._maybe_commit()
+            logger.debug("Updated image %s status to: %s", image_id, status)
             return True
         except sqlite3.Error as e:
-            print(f"[ERROR] Failed to update image status: {e}")
+            logger.error("Failed to update image status: %s", e)
             return False
 
     # =============================================================================
@@ -418,32 +809,25 @@ class DatabaseManager:
         """Get complete summary of a pipeline session"""
         try:
             # Get session info
-            session_query = "SELECT * FROM pipeline_sessions WHERE session_id = ?"
-            self.cursor.execute(session_query, (session_id,))
-            session_row = self.cursor.fetchone()
+            self._read_cursor.execute(_Q_GET_SESSION, (session_id,))
+            session_row = self._read_cursor.fetchone()
 
             if not session_row:
                 return {}
 
-            session = dict(session_row)
+            if self._session_columns is None:
+                self._session_columns = tuple(session_row.keys())
+            session = dict(zip(self._session_columns, session_row))
 
             # Get pipeline flow data (image-only pipeline: prompts → judge → reformat → images)
-            flow_query = """
-                SELECT COUNT(DISTINCT gp.prompt_id) as total_prompts,
-                       COUNT(DISTINCT CASE WHEN pe.approved = 1 THEN pe.prompt_id END) as approved_prompts,
-                       COUNT(DISTINCT rp.reformatted_id) as reformatted_prompts,
-                       COUNT(DISTINCT gi.image_id) as total_images,
-                       COUNT(DISTINCT CASE WHEN gi.generation_status = 'completed' THEN gi.image_id END) as successful_images
-                FROM pipeline_sessions ps
-                LEFT JOIN generated_prompts gp ON ps.session_id = gp.session_id
-                LEFT JOIN prompt_evaluations pe ON gp.prompt_id = pe.prompt_id
-                LEFT JOIN reformatted_prompts rp ON pe.evaluation_id = rp.evaluation_id
-                LEFT JOIN generated_images gi ON rp.reformatted_id = gi.reformatted_id
-                WHERE ps.session_id = ?
-            """
-            self.cursor.execute(flow_query, (session_id,))
-            stats_row = self.cursor.fetchone()
-            stats = dict(stats_row) if stats_row else {}
+            self._read_cursor.execute(_Q_SESSION_FLOW, (session_id,))
+            stats_row = self._read_cursor.fetchone()
+            if stats_row:
+                if self._flow_columns is None:
+                    self._flow_columns = tuple(stats_row.keys())
+                stats = dict(zip(self._flow_columns, stats_row))
+            else:
+                stats = {}
 
             return {
                 'session': session,
@@ -451,5 +835,5 @@ class DatabaseManager:
             }
 
         except sqlite3.Error as e:
-            print(f"[ERROR] Failed to get session summary: {e}")
+            logger.error("Failed to get session summary: %s", e)
             return {}
\ No newline at end of file
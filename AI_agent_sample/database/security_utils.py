@@ -3,10 +3,48 @@ Security Utilities
 Provides security functions for input validation and path sanitization
 """
 
+import functools
+import os
+import re
 from pathlib import Path
 from typing import Union, Optional
 
 
+def _is_contained(file_path: Path, base_dir: Path) -> bool:
+    """
+    Check containment with a single string-prefix comparison.
+
+    Both paths must already be resolved. Comparing the resolved strings is
+    one C-level memcmp instead of allocating and comparing O(depth) parent
+    Path objects; the trailing separator guards against sibling directories
+    with a shared prefix (/app/data vs /app/database).
+    """
+    file_str = str(file_path)
+    base_str = str(base_dir)
+    return file_str == base_str or file_str.startswith(base_str + os.sep)
+
+# Session IDs may only contain alphanumerics, underscores, and hyphens.
+# Precompiled so the whole check runs in the regex engine rather than an
+# interpreted per-character loop.
+_SESSION_ID_RE = re.compile(r'[A-Za-z0-9_-]+')
+
+# Translation table for sanitize_filename - a single str.translate pass
+# replaces the dangerous single characters in one C-level sweep instead of
+# one str.replace (and full string copy) per character
+_SANITIZE_TABLE = str.maketrans({c: '_' for c in ['/', '\\', '\x00', '\n', '\r', '\t']})
+
+
+@functools.lru_cache(maxsize=64)
+def _resolve_base(base_dir: str) -> Path:
+    """
+    Resolve a base directory once and cache the result.
+
+    The pipeline validates every generated file against the same session
+    base_dir, so re-resolving it per call just repeats the same lstat chain.
+    """
+    return Path(base_dir).resolve()
+
+
 def validate_safe_path(file_path: Union[str, Path], base_dir: Union[str, Path]) -> Optional[Path]:
     """
     Validate that a file path is safe and within the allowed base directory.
@@ -29,12 +67,13 @@ def validate_safe_path(file_path: Union[str, Path], base_dir: Union[str, Path])
     """
     try:
         # Convert to Path objects and resolve to absolute paths
+        # (the base_dir resolution is cached - it rarely changes per session)
         file_path = Path(file_path).resolve()
-        base_dir = Path(base_dir).resolve()
+        base_dir = _resolve_base(str(base_dir))
 
         # Check if the resolved file path is within the base directory
         # This prevents path traversal attacks
-        if base_dir in file_path.parents or file_path == base_dir:
+        if _is_contained(file_path, base_dir):
             return file_path
         else:
             print(f"[SECURITY WARNING] Path traversal attempt blocked: {file_path}")
@@ -46,6 +85,38 @@ def validate_safe_path(file_path: Union[str, Path], base_dir: Union[str, Path])
         return None
 
 
+class PathValidator:
+    """
+    Path validator that resolves the base directory once.
+
+    validate_safe_path re-resolves base_dir (a chain of lstat syscalls) on
+    every call. When the same base directory is checked for hundreds of
+    generated files per session, construct one validator up front instead:
+
+        validator = PathValidator(output_dir)
+        for name in filenames:
+            safe = validator.validate(output_dir / name)
+    """
+
+    def __init__(self, base_dir: Union[str, Path]):
+        self._base = Path(base_dir).resolve()
+
+    def validate(self, file_path: Union[str, Path]) -> Optional[Path]:
+        """Return the resolved path if it is within the base directory, else None"""
+        try:
+            resolved = Path(file_path).resolve(strict=False)
+        except (ValueError, OSError) as e:
+            print(f"[SECURITY WARNING] Invalid path rejected: {file_path} - {e}")
+            return None
+
+        if _is_contained(resolved, self._base):
+            return resolved
+
+        print(f"[SECURITY WARNING] Path traversal attempt blocked: {resolved}")
+        print(f"[SECURITY WARNING] Path must be within: {self._base}")
+        return None
+
+
 def sanitize_filename(filename: str, max_length: int = 255) -> str:
     """
     Sanitize a filename to prevent security issues.
@@ -67,11 +138,9 @@ def sanitize_filename(filename: str, max_length: int = 255) -> str:
         'normal_file.txt'
     """
     # Remove or replace dangerous characters
-    dangerous_chars = ['/', '\\', '..', '\x00', '\n', '\r', '\t']
-
-    sanitized = filename
-    for char in dangerous_chars:
-        sanitized = sanitized.replace(char, '_')
+    # '..' is multi-character so it needs its own replace; the rest go
+    # through the translation table in a single pass
+    sanitized = filename.replace('..', '_').translate(_SANITIZE_TABLE)
 
     # Remove leading/trailing dots and spaces (Windows issues)
     sanitized = sanitized.strip('. ')
@@ -111,16 +180,13 @@ def validate_session_id(session_id: str) -> bool:
         >>> validate_session_id("'; DROP TABLE sessions; --")
         False
     """
-    # Session IDs should only contain alphanumeric characters, underscores, and hyphens
-    allowed_chars = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-")
-
     # Check length (reasonable session ID length)
     if not (5 <= len(session_id) <= 100):
         print(f"[SECURITY WARNING] Invalid session_id length: {len(session_id)}")
         return False
 
     # Check for suspicious characters
-    if not all(c in allowed_chars for c in session_id):
+    if not _SESSION_ID_RE.fullmatch(session_id):
         print(f"[SECURITY WARNING] Invalid characters in session_id: {session_id}")
         return False
 
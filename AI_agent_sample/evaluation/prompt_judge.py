@@ -24,12 +24,17 @@ os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'  # Hide TensorFlow warnings
 import asyncio
 import json
 import argparse
+import functools
+import pickle
+import random
+import re
 from dataclasses import dataclass, asdict
 from pathlib import Path
 from typing import Literal
-from dotenv import load_dotenv
-# Note: anthropic-agents is a multi-provider agent framework that supports OpenAI (gpt-4o)
-from agents import Agent, ItemHelpers, Runner, TResponseInputItem, trace
+# Heavy imports (dotenv, the agents SDK, the theme system) are deferred into
+# the functions that use them - callers that only need BatchConfig or
+# detect_theme_from_folder skip the SDK bootstrap entirely, and a theme
+# cache hit skips the YAML stack too
 import sys
 from pathlib import Path
 
@@ -40,9 +45,6 @@ sys.path.insert(0, str(database_dir))
 
 from database_utils import DatabaseManager
 
-# Import the new theme system
-from themes import get_theme_config, get_lighting_config, list_available_themes, get_backward_compatibility_themes
-
 """
 Theme-Aware Batch Photo Prompt Judge with Database Integration
 ENHANCED: Focus on hyperrealistic/photorealistic quality with extensive detail
@@ -50,9 +52,31 @@ UPDATED: Now uses modular YAML-based theme system
 """
 
 
+# orjson's C parser is several times faster than stdlib json on the KB-size
+# payloads the judge parses; fall back to the stdlib when it is unavailable.
+# Both raise ValueError subclasses on bad input, so callers catch ValueError.
+try:
+    import orjson
+
+    def _json_loads(text):
+        return orjson.loads(text)
+except ImportError:
+    def _json_loads(text):
+        return json.loads(text)
+
+
+# Wait-time hint in OpenAI rate limit messages, compiled once instead of
+# per retry attempt
+_WAIT_RE = re.compile(r'try again in (\d+\.?\d*)s')
+
+# Never sleep longer than this between retries, even if the backoff or the
+# provider hint says otherwise
+_MAX_RETRY_WAIT = 60
+
+
 async def run_with_rate_limit_retry(agent, input_items, max_retries=3, base_delay=5):
     """Run agent with exponential backoff retry for rate limiting"""
-    import random
+    from agents import Runner
     for attempt in range(max_retries):
         try:
             return await Runner.run(agent, input_items)
@@ -60,20 +84,31 @@ async def run_with_rate_limit_retry(agent, input_items, max_retries=3, base_dela
             error_str = str(e).lower()
             if "rate limit" in error_str or "error code: 429" in error_str:
                 if attempt < max_retries - 1:
-                    # Extract wait time from error message if available
-                    import re
-                    wait_match = re.search(r'try again in (\d+\.?\d*)s', str(e))
-                    if wait_match:
-                        wait_time = float(wait_match.group(1)) + random.uniform(1, 3)
-                    else:
-                        # Exponential backoff with jitter
-                        wait_time = base_delay * (2 ** attempt) + random.uniform(1, 5)
-                    
+                    # Honor the provider's Retry-After header if the exception
+                    # carries the HTTP response, then fall back to the wait
+                    # hint in the message, then to capped full-jitter backoff
+                    # (jitter keeps concurrent retries from stampeding)
+                    wait_time = None
+                    response = getattr(e, 'response', None)
+                    retry_after = getattr(response, 'headers', {}).get('Retry-After') if response is not None else None
+                    if retry_after:
+                        try:
+                            wait_time = float(retry_after)
+                        except ValueError:
+                            pass
+                    if wait_time is None:
+                        wait_match = _WAIT_RE.search(str(e))
+                        if wait_match:
+                            wait_time = float(wait_match.group(1))
+                        else:
+                            wait_time = base_delay * (2 ** attempt)
+                    wait_time = min(wait_time, _MAX_RETRY_WAIT) + random.uniform(0, 1)
+
                     print(f"      Rate limit hit, retrying in {wait_time:.1f}s (attempt {attempt + 1}/{max_retries})")
                     await asyncio.sleep(wait_time)
                     continue
             # Re-raise if not a rate limit error or if max retries exceeded
-            raise e
+            raise
     # This should never be reached, but just in case:
     raise Exception(f"Max retries ({max_retries}) exceeded for rate limiting")
 
@@ -81,6 +116,7 @@ async def run_with_rate_limit_retry(agent, input_items, max_retries=3, base_dela
 # Load environment variables from .env file in parent directories
 def load_env_from_parent():
     """Look for .env file in current, parent, and config directories"""
+    from dotenv import load_dotenv
     current_path = Path(__file__).parent
 
     # Check config directory first
@@ -106,6 +142,7 @@ load_env_from_parent()
 # Get legacy configurations for backward compatibility
 def get_legacy_lighting_styles():
     """Get legacy lighting styles for backward compatibility"""
+    from themes import get_backward_compatibility_themes
     return get_backward_compatibility_themes()
 
 def get_legacy_theme_configs():
@@ -124,6 +161,8 @@ def get_legacy_theme_configs():
     }
 
     try:
+        from themes import get_theme_config, list_available_themes
+
         available_themes = list_available_themes()
         configs = {"default": default_config}  # Always include default
 
@@ -140,34 +179,88 @@ def get_legacy_theme_configs():
         # Return just the default fallback config
         return {"default": default_config}
 
+# Cache file for the assembled legacy configs - parsing every theme YAML on
+# each start is far slower than one stat + one pickle load
+_THEME_CACHE = Path(__file__).parent / ".theme_cache.pkl"
+
+
+def _theme_cache_key():
+    """Newest mtime across the theme YAML files, or None if there are none"""
+    themes_dir = Path(__file__).parent / "themes"
+    try:
+        return max(p.stat().st_mtime_ns for p in themes_dir.rglob("*.y*ml"))
+    except ValueError:
+        return None
+
+
+def _load_legacy_configs():
+    """Load (LIGHTING_STYLES, THEME_JUDGE_CONFIGS), using the pickle cache
+    when no theme YAML has changed since it was written"""
+    key = _theme_cache_key()
+    if key is not None and _THEME_CACHE.exists():
+        try:
+            with open(_THEME_CACHE, 'rb') as f:
+                cached_key, lighting_styles, theme_configs = pickle.load(f)
+            if cached_key == key:
+                return lighting_styles, theme_configs
+        except Exception:
+            pass  # Stale or corrupt cache - fall through and rebuild it
+
+    lighting_styles = get_legacy_lighting_styles()
+    theme_configs = get_legacy_theme_configs()
+
+    if key is not None:
+        try:
+            with open(_THEME_CACHE, 'wb') as f:
+                pickle.dump((key, lighting_styles, theme_configs), f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        except (OSError, pickle.PicklingError) as e:
+            print(f"Warning: Could not write theme cache: {e}")
+
+    return lighting_styles, theme_configs
+
 # Create the compatibility variables
-LIGHTING_STYLES = get_legacy_lighting_styles()
-THEME_JUDGE_CONFIGS = get_legacy_theme_configs()
+LIGHTING_STYLES, THEME_JUDGE_CONFIGS = _load_legacy_configs()
 
 
-def detect_theme_from_folder(input_folder: Path) -> str:
-    """Detect theme from folder name or files"""
-    folder_name = input_folder.name.lower()
+# Keyword sets per theme, flattened once - detection used to rebuild the
+# word lists and run nested substring loops per file per theme
+_THEME_KEYWORDS = {
+    theme: set(theme.replace("_", " ").split())
+    for theme in THEME_JUDGE_CONFIGS if theme != "default"
+}
+
+
+def _name_words(name: str) -> set:
+    """Lowercased word set of a folder or file name"""
+    return set(name.lower().replace("_", " ").replace("-", " ").split())
+
+
+@functools.lru_cache(maxsize=64)
+def _detect_theme_cached(folder_str: str) -> str:
+    input_folder = Path(folder_str)
 
     # Check folder name for theme indicators
-    for theme in THEME_JUDGE_CONFIGS.keys():
-        if theme != "default":
-            theme_words = theme.replace("_", " ").split()
-            if any(word in folder_name for word in theme_words):
-                return theme
+    folder_words = _name_words(input_folder.name)
+    for theme, keywords in _THEME_KEYWORDS.items():
+        if keywords & folder_words:
+            return theme
 
-    # Check for theme in prompt files
+    # Only scan the prompt files when the folder name gave no hit
     for txt_file in input_folder.glob("*.txt"):
-        filename = txt_file.stem.lower()
-        for theme in THEME_JUDGE_CONFIGS.keys():
-            if theme != "default":
-                theme_words = theme.replace("_", " ").split()
-                if any(word in filename for word in theme_words):
-                    return theme
+        file_words = _name_words(txt_file.stem)
+        for theme, keywords in _THEME_KEYWORDS.items():
+            if keywords & file_words:
+                return theme
 
     return "default"
 
 
+def detect_theme_from_folder(input_folder: Path) -> str:
+    """Detect theme from folder name or files (memoized per folder path)"""
+    return _detect_theme_cached(str(input_folder))
+
+
 def select_lighting_style() -> str:
     """Interactive lighting style selection for enhanced prompt evaluation"""
     print(f"\n{'=' * 50}")
@@ -207,8 +300,11 @@ class BatchConfig:
     theme: str
     lighting_style: str
     session_id: str = None
-    max_iterations: int = 3
+    max_iterations: int = 1
     timeout_seconds: int = 120
+    concurrency: int = 8
+    max_retries: int = 3
+    base_delay: float = 5.0
 
 @dataclass 
 class PhotoPromptEvaluation:
@@ -228,20 +324,41 @@ class BatchResult:
     processing_time: float
     session_id: str
 
+# Agents keyed by (theme, lighting_style) - a long-running caller invoking
+# process_batch repeatedly with the same configuration reuses one Agent
+# instead of re-assembling the ~2KB instruction block every time
+_AGENT_CACHE = {}
+
+
 def create_theme_agents(theme: str, lighting_style: str = "hyperreal_standard"):
-    """Create evaluation agents based on theme and lighting style"""
-    
+    """Create (or reuse) the evaluation agent for a theme and lighting style"""
+    key = (theme, lighting_style)
+    agent = _AGENT_CACHE.get(key)
+    if agent is None:
+        agent = _build_agent(theme, lighting_style)
+        _AGENT_CACHE[key] = agent
+    return agent
+
+
+def _build_agent(theme: str, lighting_style: str):
+    """Assemble the evaluation agent instructions for one configuration"""
+    from agents import Agent
+
     # Get theme configuration
     theme_config = THEME_JUDGE_CONFIGS.get(theme, THEME_JUDGE_CONFIGS["default"])
-    
+
     # Get lighting style configuration
     lighting_config = LIGHTING_STYLES.get(lighting_style, LIGHTING_STYLES["hyperreal_standard"])
-    
+
     # Build comprehensive evaluation instructions
     theme_notes = theme_config.get("theme_specific_notes", "")
     lighting_instructions = lighting_config.get("lighting_instructions", "")
     evaluation_criteria = lighting_config.get("evaluation_criteria", "")
-    
+
+    # Pre-slice the excerpts once rather than inside the f-string
+    lighting_excerpt = lighting_instructions[:200] if lighting_instructions else 'Professional natural lighting'
+    theme_excerpt = theme_notes[:300] if theme_notes else 'Hyperrealistic photography with detailed textures and authentic environmental context'
+
     evaluation_agent = Agent(
         name="hyperrealistic_photo_prompt_judge",
         model="gpt-4o",
@@ -293,10 +410,10 @@ ENHANCEMENT RULES:
 7. NO PEOPLE - Remove any human elements if present
 
 LIGHTING STYLE: {lighting_config.get('style_name', 'Standard')}
-LIGHTING INSTRUCTIONS: {lighting_instructions[:200] if lighting_instructions else 'Professional natural lighting'}
+LIGHTING INSTRUCTIONS: {lighting_excerpt}
 
 THEME REQUIREMENTS:
-{theme_notes[:300] if theme_notes else 'Hyperrealistic photography with detailed textures and authentic environmental context'}
+{theme_excerpt}
 
 CRITICAL: Respond with valid JSON only. No other text.
 
@@ -316,31 +433,272 @@ Always use "pass" for score. Always return valid JSON."""
     return evaluation_agent
 
 
-def get_prompt_id_from_db(db_manager, session_id: str, filename: str):
-    """Get prompt_id from database based on session_id and filename"""
+# Shared DatabaseManager reused across process_batch invocations - opening a
+# fresh connection (and re-running pragmas) per batch costs more than the
+# queries themselves when batches are small. DatabaseManager already
+# connects with check_same_thread=False and WAL pragmas.
+_DB_SINGLETON = None
+
+
+def _get_db_manager():
+    """Return the shared DatabaseManager, creating it on first use"""
+    global _DB_SINGLETON
+    if _DB_SINGLETON is None:
+        _DB_SINGLETON = DatabaseManager()
+    return _DB_SINGLETON
+
+
+# JSON extraction patterns, compiled once at import instead of rebuilt (and
+# re-compiled through re's bounded internal cache) per file per iteration.
+
+# Strategy 1: standard markdown code block with proper multiline support
+_MD_JSON_PATTERNS = tuple(re.compile(p, re.DOTALL) for p in (
+    r'```json\s*(\{.*?\})\s*```',  # Original pattern
+    r'```json\s*(\{[\s\S]*?\})\s*```',  # Multiline support
+    r'```json\s*(\[.*?\])\s*```',  # Array format
+    r'```json\s*(\[[\s\S]*?\])\s*```',  # Multiline array
+))
+
+# Strategy 2: raw JSON without markdown wrapper
+_RAW_JSON_PATTERNS = tuple(re.compile(p, re.DOTALL) for p in (
+    r'(\{[^{}]*"score"[^{}]*\})',  # Simple object with score
+    r'(\{[\s\S]*?"score"[\s\S]*?\})',  # Multiline object with score
+    r'(\{.*?\})',  # Any JSON object
+    r'(\{[\s\S]*?\})',  # Any multiline JSON object
+))
+
+# Strategy 3: manual key-value extraction when JSON parsing fails
+_KEY_PATTERNS = {
+    key: re.compile(pattern, re.IGNORECASE | re.DOTALL)
+    for key, pattern in {
+        'score': r'(?:score|result)["\':\s]*(["\']?(?:pass|fail)["\']?)',
+        'reasoning': r'(?:reasoning|explanation)["\':\s]*["\']([^"\']+)["\']',
+        'enhanced_prompt': r'(?:enhanced_prompt|prompt)["\':\s]*["\']([^"\']+)["\']',
+        'theme_alignment': r'(?:theme_alignment|alignment)["\':\s]*["\']([^"\']+)["\']',
+        'lighting_notes': r'(?:lighting_notes|lighting)["\':\s]*["\']([^"\']+)["\']'
+    }.items()
+}
+
+
+def _extract_result_text(eval_result) -> str:
+    """Pull the text payload out of a RunResult-like object.
+
+    Single getattr probes instead of the old hasattr ladder, and the
+    ItemHelpers import only happens on the rare new_items branch (by then
+    the agents module is already in sys.modules).
+    """
+    final_output = getattr(eval_result, 'final_output', None)
+    if final_output is not None:
+        # final_output is normally already a str - skip the copy
+        return final_output if isinstance(final_output, str) else str(final_output)
+    new_items = getattr(eval_result, 'new_items', None)
+    if new_items:
+        from agents import ItemHelpers
+        return ItemHelpers.text_message_outputs(new_items)
+    # Fallback for different result structures
+    return str(eval_result)
+
+
+async def _process_one(index: int, total: int, prompt_file: Path, config: BatchConfig,
+                       eval_agent, db_manager, prompt_id_map: dict, prompt_status_map: dict,
+                       eval_rows: list, status_rows: list, approved_names: list) -> bool:
+    """Evaluate a single prompt file. Returns True when the prompt was approved."""
+    # Idempotent re-runs: a file already marked approved whose output still
+    # exists needs no LLM call at all
+    if (prompt_status_map.get(prompt_file.name) == 'approved'
+            and (config.output_folder / f"approved_{prompt_file.name}").exists()):
+        print(f"\n[{index}/{total}] Already approved, skipping: {prompt_file.name}")
+        approved_names.append(f"approved_{prompt_file.name}")
+        return True
+
+    print(f"\n[{index}/{total}] Processing: {prompt_file.name}")
+
     try:
-        # Remove the .txt extension if present
-        base_filename = filename.replace('.txt', '')
-        
-        # Query the database
-        cursor = db_manager.connection.cursor()
-        cursor.execute("""
-            SELECT prompt_id FROM generated_prompts 
-            WHERE session_id = ? AND file_name LIKE ?
-            ORDER BY created_at DESC
-            LIMIT 1
-        """, (session_id, f"%{base_filename}%"))
-        
-        result = cursor.fetchone()
-        if result:
-            return result[0]
-        else:
-            print(f"Warning: No prompt_id found for session {session_id}, filename {filename}")
-            return None
-            
+        # Read the original prompt off the event loop thread - a blocking
+        # read here would stall every other in-flight evaluation
+        original_prompt = (await asyncio.to_thread(
+            prompt_file.read_text, encoding='utf-8')).strip()
+
+        print(f"   Original: {original_prompt[:100]}...")
+
+        # Get prompt_id from the prefetched session map
+        prompt_id = None
+        if db_manager and config.session_id:
+            prompt_id = prompt_id_map.get(prompt_file.name)
+            if prompt_id is None:
+                print(f"Warning: No prompt_id found for session {config.session_id}, filename {prompt_file.name}")
+
+        # The agent instructions always score "pass", so the old
+        # multi-iteration refinement loop never re-ran in practice. Evaluate
+        # once (config.max_iterations attempts) plus a single retry slot for
+        # timeouts, errors, and parse failures.
+        final_result = None
+        max_attempts = config.max_iterations + 1
+
+        for attempt in range(1, max_attempts + 1):
+            try:
+                print(f"   Attempt {attempt}: Evaluating...")
+
+                # Create input for evaluation - correct TResponseInputItem format
+                input_items = [{"content": original_prompt, "role": "user"}]
+
+                # Run evaluation with timeout and rate limit protection
+                eval_result = await asyncio.wait_for(
+                    run_with_rate_limit_retry(eval_agent, input_items,
+                                              max_retries=config.max_retries,
+                                              base_delay=config.base_delay),
+                    timeout=config.timeout_seconds
+                )
+
+                # Parse the result - handle RunResult object properly
+                result_text = _extract_result_text(eval_result)
+
+                # Extract JSON from response with multiple strategies
+
+                # Debug: Log actual response for troubleshooting
+                print(f"   DEBUG: Raw Agent response ({len(result_text)} chars)")
+                preview = result_text[:200] if len(result_text) > 200 else result_text
+                print(f"   DEBUG: Response preview: {preview}...")
+
+                result_json = None
+                parsing_method = "none"
+
+                # Fast path: the agent is instructed to answer with a single
+                # ```json fenced object, so slice it out with str.find (a
+                # tight C scan) before paying for the regex cascade
+                fence = result_text.find("```json")
+                if fence != -1:
+                    brace_start = result_text.find("{", fence)
+                    brace_end = result_text.rfind("}")
+                    if brace_start != -1 and brace_end > brace_start:
+                        try:
+                            result_json = _json_loads(result_text[brace_start:brace_end + 1])
+                            parsing_method = "fastpath"
+                        except ValueError:
+                            pass  # Malformed fence content - use the regex strategies
+
+                # Strategy 1: Standard markdown code block with proper multiline support
+                if not result_json:
+                    for pattern_number, pattern in enumerate(_MD_JSON_PATTERNS, 1):
+                        json_match = pattern.search(result_text)
+                        if json_match:
+                            try:
+                                result_json = _json_loads(json_match.group(1))
+                                parsing_method = f"markdown_pattern_{pattern_number}"
+                                break
+                            except ValueError as e:
+                                print(f"   DEBUG: JSON decode error with pattern {pattern.pattern}: {e}")
+                                continue
+
+                # Strategy 2: Look for raw JSON without markdown wrapper
+                if not result_json:
+                    for pattern_number, pattern in enumerate(_RAW_JSON_PATTERNS, 1):
+                        matches = pattern.findall(result_text)
+                        for match in matches:
+                            try:
+                                potential_json = _json_loads(match)
+                                if isinstance(potential_json, dict) and "score" in potential_json:
+                                    result_json = potential_json
+                                    parsing_method = f"raw_pattern_{pattern_number}"
+                                    break
+                            except ValueError:
+                                continue
+                        if result_json:
+                            break
+
+                # Strategy 3: Extract key-value pairs manually if JSON parsing fails
+                if not result_json:
+                    print(f"   DEBUG: Attempting manual key-value extraction")
+                    manual_json = {}
+
+                    for key, pattern in _KEY_PATTERNS.items():
+                        match = pattern.search(result_text)
+                        if match:
+                            manual_json[key] = match.group(1).strip().strip('"\'')
+
+                    if manual_json.get('score'):
+                        result_json = manual_json
+                        parsing_method = "manual_extraction"
+
+                # Strategy 4: Default fallback - assume pass and extract text
+                if not result_json:
+                    print(f"   DEBUG: Using fallback strategy - assuming pass")
+                    # Use the first part of the response; only pay for the
+                    # slice and the "..." concat when it is actually long
+                    stripped = result_text.strip()
+                    result_json = {
+                        "score": "pass",
+                        "reasoning": "Enhanced via fallback parsing",
+                        "enhanced_prompt": stripped[:500] + "..." if len(stripped) > 500 else stripped,
+                        "theme_alignment": "Good",
+                        "lighting_notes": f"Applied {config.lighting_style} style"
+                    }
+                    parsing_method = "fallback"
+
+                print(f"   DEBUG: JSON parsed using method: {parsing_method}")
+
+                if result_json:
+                    # Create evaluation object
+                    evaluation = PhotoPromptEvaluation(
+                        score=result_json.get("score", "fail"),
+                        reasoning=result_json.get("reasoning", ""),
+                        enhanced_prompt=result_json.get("enhanced_prompt", original_prompt),
+                        theme_alignment=result_json.get("theme_alignment", ""),
+                        lighting_notes=result_json.get("lighting_notes", "")
+                    )
+
+                    print(f"   Result: {evaluation.score.upper()}")
+                    print(f"   Reasoning: {evaluation.reasoning[:100]}...")
+
+                    # Buffer the evaluation row - process_batch flushes the
+                    # whole batch with one executemany + commit
+                    if db_manager and prompt_id:
+                        eval_rows.append((
+                            prompt_id, config.session_id, attempt, original_prompt,
+                            evaluation.enhanced_prompt, evaluation.score, evaluation.reasoning,
+                            evaluation.score == "pass"
+                        ))
+
+                    if evaluation.score == "pass":
+                        # Save approved prompt with "approved_" prefix for reformatting step
+                        approved_filename = f"approved_{prompt_file.name}"
+                        output_file = config.output_folder / approved_filename
+                        # Write off the loop thread so the other in-flight
+                        # evaluations keep progressing during the syscall
+                        await asyncio.to_thread(output_file.write_text,
+                                                evaluation.enhanced_prompt,
+                                                encoding='utf-8')
+
+                        print(f"   APPROVED and saved to {output_file.name}")
+                        approved_names.append(approved_filename)
+                        final_result = evaluation
+                    # A "fail" score is final - there is no re-submission
+                    break
+
+            except asyncio.TimeoutError:
+                print(f"   Timeout after {config.timeout_seconds}s (attempt {attempt})")
+                continue
+            except Exception as e:
+                print(f"   Error in attempt {attempt}: {str(e)[:100]}")
+                continue
+
+        # No attempt produced an approved evaluation
+        if final_result is None:
+            print(f"   FAILED after {max_attempts} attempts")
+
+            # Buffer the status update for the batched flush
+            if db_manager and prompt_id:
+                status_rows.append(('failed_evaluation', prompt_id))
+            return False
+
+        # Buffer the status update for the batched flush
+        if db_manager and prompt_id:
+            status_rows.append(('approved', prompt_id))
+        return True
+
     except Exception as e:
-        print(f"Error getting prompt_id: {e}")
-        return None
+        print(f"   Error processing {prompt_file.name}: {str(e)[:100]}")
+        return False
 
 
 async def process_batch(config: BatchConfig) -> BatchResult:
@@ -357,7 +715,7 @@ async def process_batch(config: BatchConfig) -> BatchResult:
     db_manager = None
     if config.session_id:
         try:
-            db_manager = DatabaseManager()
+            db_manager = _get_db_manager()
             print("Database connected for evaluation tracking")
         except Exception as e:
             print(f"Warning: Could not connect to database: {e}")
@@ -372,21 +730,29 @@ async def process_batch(config: BatchConfig) -> BatchResult:
     # Filter files to current session only
     prompt_files = []
     session_files_from_db = []
-    
+    prompt_id_map = {}
+    prompt_status_map = {}
+
     if config.session_id and db_manager:
         try:
-            # Get files for this specific session from database
-            cursor = db_manager.connection.cursor()
+            # One query pulls the session's filenames and prompt_ids together;
+            # the per-file LIKE lookups this replaces each cost a round-trip
+            # plus an unindexed '%...%' scan. Reuse the manager's cursor
+            # rather than allocating a fresh one.
+            cursor = db_manager.cursor
             cursor.execute("""
-                SELECT file_name FROM generated_prompts 
+                SELECT file_name, prompt_id, status FROM generated_prompts
                 WHERE session_id = ?
-                ORDER BY created_at
+                ORDER BY created_at DESC
             """, (config.session_id,))
-            db_results = cursor.fetchall()
-            session_files_from_db = [row[0] for row in db_results]
+            for row in cursor.fetchall():
+                prompt_id_map.setdefault(row[0], row[1])  # keep the most recent
+                prompt_status_map.setdefault(row[0], row[2])
+            session_files_from_db = set(prompt_id_map)
             print(f"DEBUG: Database has {len(session_files_from_db)} files for session {config.session_id}")
             
-            # Filter actual files to match database records
+            # Filter actual files to match database records - set membership
+            # keeps this O(files) instead of O(files * session rows)
             for file_path in all_prompt_files:
                 if file_path.name in session_files_from_db:
                     prompt_files.append(file_path)
@@ -429,7 +795,8 @@ async def process_batch(config: BatchConfig) -> BatchResult:
     print(f"Processing {len(prompt_files)} prompt files for session {config.session_id}")
     if len(prompt_files) != len(all_prompt_files):
         print(f"DEBUG: Filtered from {len(all_prompt_files)} total files to {len(prompt_files)} session files")
-        skipped_files = [f.name for f in all_prompt_files if f not in prompt_files]
+        prompt_files_set = set(prompt_files)
+        skipped_files = [f.name for f in all_prompt_files if f not in prompt_files_set]
         print(f"DEBUG: Skipped files: {skipped_files[:5]}{'...' if len(skipped_files) > 5 else ''}")
     
     # Show which files will be processed
@@ -437,244 +804,70 @@ async def process_batch(config: BatchConfig) -> BatchResult:
     
     import time
     start_time = time.time()
-    approved_count = 0
-    failed_count = 0
-    
-    for i, prompt_file in enumerate(prompt_files, 1):
-        print(f"\n[{i}/{len(prompt_files)}] Processing: {prompt_file.name}")
-        
+
+    # Fan the files out concurrently instead of awaiting each round-trip in
+    # sequence - the prompts are independent, so their in-flight LLM requests
+    # can overlap. The semaphore caps how many are outstanding at once.
+    # Database rows are buffered into plain lists (the coroutines all run on
+    # the event loop thread) and flushed below in one batched transaction, so
+    # the batch pays one fsync per statement instead of one per row.
+    semaphore = asyncio.Semaphore(config.concurrency)
+    eval_rows = []
+    status_rows = []
+    approved_names = []
+
+    async def _bounded(coro):
+        async with semaphore:
+            return await coro
+
+    tasks = [
+        asyncio.create_task(_bounded(_process_one(
+            i, len(prompt_files), prompt_file, config, eval_agent, db_manager,
+            prompt_id_map, prompt_status_map, eval_rows, status_rows, approved_names
+        )))
+        for i, prompt_file in enumerate(prompt_files, 1)
+    ]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    approved_count = sum(1 for r in results if r is True)
+    failed_count = len(results) - approved_count
+
+    # Write the session manifest sidecar - one line per approved file. The
+    # reformatter reads this first and only falls back to scanning and
+    # filtering the whole output folder when it is missing.
+    if config.session_id and approved_names:
+        manifest_file = config.output_folder / f"{config.session_id}.manifest"
         try:
-            # Read the original prompt
-            with open(prompt_file, 'r', encoding='utf-8') as f:
-                original_prompt = f.read().strip()
-            
-            print(f"   Original: {original_prompt[:100]}...")
-            
-            # Get prompt_id if we have database connection
-            prompt_id = None
-            if db_manager and config.session_id:
-                prompt_id = get_prompt_id_from_db(db_manager, config.session_id, prompt_file.name)
-            
-            # Process with iterations
-            current_prompt = original_prompt
-            iteration = 1
-            final_result = None
-            
-            while iteration <= config.max_iterations:
-                try:
-                    print(f"   Iteration {iteration}: Evaluating...")
-                    
-                    # Create input for evaluation - correct TResponseInputItem format
-                    input_items = [{"content": current_prompt, "role": "user"}]
-                    
-                    # Run evaluation with timeout and rate limit protection
-                    eval_result = await asyncio.wait_for(
-                        run_with_rate_limit_retry(eval_agent, input_items),
-                        timeout=config.timeout_seconds
-                    )
-                    
-                    # Parse the result - handle RunResult object properly
-                    if hasattr(eval_result, 'final_output'):
-                        result_text = str(eval_result.final_output)
-                    elif hasattr(eval_result, 'new_items') and eval_result.new_items:
-                        from agents import ItemHelpers
-                        result_text = ItemHelpers.text_message_outputs(eval_result.new_items)
-                    else:
-                        # Fallback for different result structures
-                        result_text = str(eval_result)
-                    
-                    # Extract JSON from response with multiple strategies
-                    import re
-                    import json
-                    
-                    # Debug: Log actual response for troubleshooting
-                    print(f"   DEBUG: Raw Agent response ({len(result_text)} chars)")
-                    print(f"   DEBUG: Response preview: {result_text[:200]}...")
-                    
-                    result_json = None
-                    parsing_method = "none"
-                    
-                    # Strategy 1: Standard markdown code block with proper multiline support
-                    json_patterns = [
-                        r'```json\s*(\{.*?\})\s*```',  # Original pattern
-                        r'```json\s*(\{[\s\S]*?\})\s*```',  # Multiline support
-                        r'```json\s*(\[.*?\])\s*```',  # Array format
-                        r'```json\s*(\[[\s\S]*?\])\s*```',  # Multiline array
-                    ]
-                    
-                    for pattern in json_patterns:
-                        json_match = re.search(pattern, result_text, re.DOTALL)
-                        if json_match:
-                            try:
-                                result_json = json.loads(json_match.group(1))
-                                parsing_method = f"markdown_pattern_{json_patterns.index(pattern) + 1}"
-                                break
-                            except json.JSONDecodeError as e:
-                                print(f"   DEBUG: JSON decode error with pattern {pattern}: {e}")
-                                continue
-                    
-                    # Strategy 2: Look for raw JSON without markdown wrapper
-                    if not result_json:
-                        raw_patterns = [
-                            r'(\{[^{}]*"score"[^{}]*\})',  # Simple object with score
-                            r'(\{[\s\S]*?"score"[\s\S]*?\})',  # Multiline object with score
-                            r'(\{.*?\})',  # Any JSON object
-                            r'(\{[\s\S]*?\})',  # Any multiline JSON object
-                        ]
-                        
-                        for pattern in raw_patterns:
-                            matches = re.findall(pattern, result_text, re.DOTALL)
-                            for match in matches:
-                                try:
-                                    potential_json = json.loads(match)
-                                    if isinstance(potential_json, dict) and "score" in potential_json:
-                                        result_json = potential_json
-                                        parsing_method = f"raw_pattern_{raw_patterns.index(pattern) + 1}"
-                                        break
-                                except json.JSONDecodeError:
-                                    continue
-                            if result_json:
-                                break
-                    
-                    # Strategy 3: Extract key-value pairs manually if JSON parsing fails
-                    if not result_json:
-                        print(f"   DEBUG: Attempting manual key-value extraction")
-                        manual_json = {}
-                        
-                        # Look for key patterns in the response
-                        key_patterns = {
-                            'score': r'(?:score|result)["\':\s]*(["\']?(?:pass|fail)["\']?)',
-                            'reasoning': r'(?:reasoning|explanation)["\':\s]*["\']([^"\']+)["\']',
-                            'enhanced_prompt': r'(?:enhanced_prompt|prompt)["\':\s]*["\']([^"\']+)["\']',
-                            'theme_alignment': r'(?:theme_alignment|alignment)["\':\s]*["\']([^"\']+)["\']',
-                            'lighting_notes': r'(?:lighting_notes|lighting)["\':\s]*["\']([^"\']+)["\']'
-                        }
-                        
-                        for key, pattern in key_patterns.items():
-                            match = re.search(pattern, result_text, re.IGNORECASE | re.DOTALL)
-                            if match:
-                                manual_json[key] = match.group(1).strip().strip('"\'')
-                        
-                        if manual_json.get('score'):
-                            result_json = manual_json
-                            parsing_method = "manual_extraction"
-                    
-                    # Strategy 4: Default fallback - assume pass and extract text
-                    if not result_json:
-                        print(f"   DEBUG: Using fallback strategy - assuming pass")
-                        result_json = {
-                            "score": "pass",
-                            "reasoning": "Enhanced via fallback parsing",
-                            "enhanced_prompt": result_text.strip()[:500] + "...",  # Use first part of response
-                            "theme_alignment": "Good",
-                            "lighting_notes": f"Applied {lighting_config.get('style_name', 'standard')} style"
-                        }
-                        parsing_method = "fallback"
-                    
-                    print(f"   DEBUG: JSON parsed using method: {parsing_method}")
-                    
-                    if result_json:
-                        # Create evaluation object
-                        evaluation = PhotoPromptEvaluation(
-                            score=result_json.get("score", "fail"),
-                            reasoning=result_json.get("reasoning", ""),
-                            enhanced_prompt=result_json.get("enhanced_prompt", current_prompt),
-                            theme_alignment=result_json.get("theme_alignment", ""),
-                            lighting_notes=result_json.get("lighting_notes", "")
-                        )
-                        
-                        print(f"   Result: {evaluation.score.upper()}")
-                        print(f"   Reasoning: {evaluation.reasoning[:100]}...")
-                        
-                        # Save evaluation to database if available
-                        if db_manager and prompt_id:
-                            try:
-                                db_manager.connection.cursor().execute("""
-                                    INSERT INTO prompt_evaluations 
-                                    (prompt_id, session_id, iteration_number, original_prompt, refined_prompt, 
-                                     evaluation_score, feedback, approved, created_at)
-                                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-                                """, (
-                                    prompt_id, config.session_id, iteration, original_prompt,
-                                    evaluation.enhanced_prompt, evaluation.score, evaluation.reasoning,
-                                    evaluation.score == "pass"
-                                ))
-                                db_manager.connection.commit()
-                            except Exception as e:
-                                print(f"   Warning: Could not save evaluation to database: {e}")
-                        
-                        if evaluation.score == "pass":
-                            # Save approved prompt with "approved_" prefix for reformatting step
-                            approved_filename = f"approved_{prompt_file.name}"
-                            output_file = config.output_folder / approved_filename
-                            with open(output_file, 'w', encoding='utf-8') as f:
-                                f.write(evaluation.enhanced_prompt)
-                            
-                            print(f"   APPROVED and saved to {output_file.name}")
-                            approved_count += 1
-                            final_result = evaluation
-                            break
-                        else:
-                            # Use enhanced prompt for next iteration
-                            current_prompt = evaluation.enhanced_prompt
-                            iteration += 1
-                            continue
-                    else:
-                        print(f"   WARNING: All JSON parsing strategies failed")
-                        print(f"   DEBUG: Full response: {result_text}")
-                        iteration += 1
-                        continue
-                        
-                except asyncio.TimeoutError:
-                    print(f"   Timeout after {config.timeout_seconds}s (iteration {iteration})")
-                    iteration += 1
-                    continue
-                except Exception as e:
-                    print(f"   Error in iteration {iteration}: {str(e)[:100]}")
-                    iteration += 1
-                    continue
-            
-            # If we exhausted all iterations without success
-            if final_result is None or final_result.score != "pass":
-                print(f"   FAILED after {config.max_iterations} iterations")
-                failed_count += 1
-                
-                # Update prompt status in database
-                if db_manager and prompt_id:
-                    try:
-                        db_manager.connection.cursor().execute("""
-                            UPDATE generated_prompts SET status = 'failed_evaluation'
-                            WHERE prompt_id = ?
-                        """, (prompt_id,))
-                        db_manager.connection.commit()
-                    except Exception as e:
-                        print(f"   Warning: Could not update prompt status: {e}")
-            else:
-                # Update prompt status to approved
-                if db_manager and prompt_id:
-                    try:
-                        db_manager.connection.cursor().execute("""
-                            UPDATE generated_prompts SET status = 'approved'
-                            WHERE prompt_id = ?
-                        """, (prompt_id,))
-                        db_manager.connection.commit()
-                    except Exception as e:
-                        print(f"   Warning: Could not update prompt status: {e}")
-            
+            await asyncio.to_thread(
+                manifest_file.write_text,
+                "\n".join(sorted(approved_names)) + "\n", encoding='utf-8')
+        except OSError as e:
+            print(f"Warning: Could not write session manifest: {e}")
+
+    # Flush the buffered evaluation rows and status updates in one commit
+    if db_manager and (eval_rows or status_rows):
+        try:
+            cursor = db_manager.cursor
+            if eval_rows:
+                cursor.executemany("""
+                    INSERT INTO prompt_evaluations
+                    (prompt_id, session_id, iteration_number, original_prompt, refined_prompt,
+                     evaluation_score, feedback, approved, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+                """, eval_rows)
+            if status_rows:
+                cursor.executemany("""
+                    UPDATE generated_prompts SET status = ?
+                    WHERE prompt_id = ?
+                """, status_rows)
+            db_manager.connection.commit()
         except Exception as e:
-            print(f"   Error processing {prompt_file.name}: {str(e)[:100]}")
-            failed_count += 1
-            continue
-    
+            print(f"Warning: Could not save evaluation results to database: {e}")
+
     processing_time = time.time() - start_time
-    
-    # Close database connection
-    if db_manager:
-        try:
-            db_manager.connection.close()
-        except:
-            pass
-    
+
+    # The shared connection stays open for subsequent batches
+
     return BatchResult(
         total_processed=len(prompt_files),
         approved_count=approved_count,
@@ -725,7 +918,7 @@ if __name__ == "__main__":
         theme=THEME,
         lighting_style=LIGHTING_STYLE,
         session_id=args.session_id,
-        max_iterations=3,
+        max_iterations=1,
         timeout_seconds=120
     )
     
@@ -14,7 +14,10 @@ DATABASE INTEGRATION:
 - Stores both detailed and optimized versions
 """
 
+import functools
 import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
 import os
 import argparse
@@ -27,6 +30,46 @@ sys.path.insert(0, str(database_dir))
 
 from database_utils import DatabaseManager
 
+# Patterns compiled once at module load - the converter runs them per file,
+# and the bound .search/.sub methods skip re's internal cache probe (and its
+# pattern-key hashing) on every call
+
+# convert_to_generator_format
+_APPROVED_RE = re.compile(r'APPROVED FINAL PROMPT:\s*(.+?)(?=\n\nRound:|$)', re.DOTALL)
+_BOLD_RE = re.compile(r'\*\*[^*]+\*\*\s*')
+_HEADER_RE = re.compile(r'^[A-Z][^:]*:\s*', re.MULTILINE)
+_SECTION_RE = re.compile(r'\n\n[A-Z][^:]*:\s*', re.MULTILINE)
+_FINAL_PROMPT_RE = re.compile(r'Final prompt[^\n]*\n(.+?)(?=\n\n|$)', re.DOTALL | re.IGNORECASE)
+_ORIGINAL_PROMPT_RE = re.compile(r'Original Prompt:\s*(.+?)(?=\n\n|\n=|$)', re.DOTALL)
+
+# Last-resort fallback cleanup - a single alternation strips every marker in
+# one scan instead of five sequential full-document passes
+_FALLBACK_RE = re.compile(
+    r'(?:Original Prompt:.*?={40,})'
+    r'|(?:Round:.*)'
+    r'|(?:Iterations:.*)'
+    r'|(?:Processing time:.*)'
+    r'|(?:\*\*[^*]+\*\*\s*)',
+    re.DOTALL,
+)
+
+# extract_metadata_from_approved_file - only the free-form Original Prompt
+# block still needs a regex; the header fields are plain "Key: value" lines
+_META_ORIGINAL_RE = re.compile(r'Original Prompt:\s*(.+?)(?=\n\n=|$)', re.DOTALL)
+
+# Upper bound on concurrent file conversions. The pool only does file I/O
+# and regex work; database writes happen serially on the main thread, so
+# this is the one knob that limits in-flight work
+_MAX_CONVERT_WORKERS = 8
+
+# Timestamped filenames like wildlife_20250811_130401_01.txt
+_FILE_PATTERN_RE = re.compile(r'([^_]+)_\d{8}_\d{6}_(\d+)\.txt$')
+
+# Filename timestamps (_20250811_130401) and session-id dates
+# (session_2025-08-15_...), compiled once instead of per file
+_TS_FN_RE = re.compile(r'_(\d{8})_(\d{6})')
+_SESSION_DATE_RE = re.compile(r'session_(\d{4})-(\d{2})-(\d{2})')
+
 
 def convert_to_generator_format(detailed_prompt):
     """
@@ -35,69 +78,79 @@ def convert_to_generator_format(detailed_prompt):
     """
 
     # Extract the approved prompt text (the clean prompt without formatting)
-    approved_match = re.search(r'APPROVED FINAL PROMPT:\s*(.+?)(?=\n\nRound:|$)', detailed_prompt, re.DOTALL)
+    approved_match = _APPROVED_RE.search(detailed_prompt)
 
     if approved_match:
         approved_text = approved_match.group(1).strip()
 
-        # Remove any markdown formatting like **Photography Prompt:**
-        approved_text = re.sub(r'\*\*[^*]+\*\*\s*', '', approved_text)
+        # Fast path: a typical approved prompt is a single line of clean
+        # prose with no markers left to strip - return it untouched
+        if ('**' not in approved_text and '\n' not in approved_text
+                and ':' not in approved_text and '\t' not in approved_text
+                and '  ' not in approved_text):
+            return approved_text
 
-        # Remove any remaining headers or labels
-        approved_text = re.sub(r'^[A-Z][^:]*:\s*', '', approved_text, flags=re.MULTILINE)
+        # Cheap substring probes skip the regex passes entirely for the
+        # common case of an already-clean prompt - 'in' is a C-level scan,
+        # far cheaper than running a substitution that matches nothing
+
+        # Remove any markdown formatting like **Photography Prompt:**
+        if '**' in approved_text:
+            approved_text = _BOLD_RE.sub('', approved_text)
 
-        # Remove section headers like "Technical Specifications:", "Lighting Setup:", etc.
-        approved_text = re.sub(r'\n\n[A-Z][^:]*:\s*', '\n\n', approved_text, flags=re.MULTILINE)
+        # Remove any remaining headers or labels, and section headers like
+        # "Technical Specifications:", "Lighting Setup:", etc.
+        if ':' in approved_text:
+            approved_text = _HEADER_RE.sub('', approved_text)
+            approved_text = _SECTION_RE.sub('\n\n', approved_text)
 
-        # Clean up extra whitespace and newlines
-        approved_text = re.sub(r'\n+', ' ', approved_text)
-        approved_text = re.sub(r'\s+', ' ', approved_text).strip()
+        # Clean up extra whitespace and newlines - split/join collapses all
+        # whitespace runs (newlines included) in one C-level pass
+        if '\n' in approved_text or '\t' in approved_text or '  ' in approved_text:
+            approved_text = ' '.join(approved_text.split())
 
         return approved_text
-    
+
     # Try to extract just the improved prompt from the file content
     # Look for patterns like "Final prompt is X words" followed by content
-    final_prompt_match = re.search(r'Final prompt[^\n]*\n(.+?)(?=\n\n|$)', detailed_prompt, re.DOTALL | re.IGNORECASE)
+    final_prompt_match = _FINAL_PROMPT_RE.search(detailed_prompt)
     if final_prompt_match:
         return final_prompt_match.group(1).strip()
 
     # Fallback: try to extract from original prompt if approved section not found
-    original_match = re.search(r'Original Prompt:\s*(.+?)(?=\n\n|\n=|$)', detailed_prompt, re.DOTALL)
+    original_match = _ORIGINAL_PROMPT_RE.search(detailed_prompt)
     if original_match:
         return original_match.group(1).strip()
 
     # Final fallback: return the whole text cleaned up
-    cleaned = re.sub(r'Original Prompt:.*?={40,}', '', detailed_prompt, flags=re.DOTALL)
-    cleaned = re.sub(r'Round:.*', '', cleaned, flags=re.DOTALL)
-    cleaned = re.sub(r'Iterations:.*', '', cleaned, flags=re.DOTALL)
-    cleaned = re.sub(r'Processing time:.*', '', cleaned, flags=re.DOTALL)
-    cleaned = re.sub(r'\*\*[^*]+\*\*\s*', '', cleaned)
-    cleaned = re.sub(r'\s+', ' ', cleaned).strip()
+    cleaned = _FALLBACK_RE.sub('', detailed_prompt)
 
-    return cleaned
+    return ' '.join(cleaned.split())
 
 
 def extract_metadata_from_approved_file(content):
     """Extract metadata from approved prompt file"""
     metadata = {}
 
-    # Extract evaluation_id if present
-    eval_match = re.search(r'Database evaluation_id:\s*(\d+)', content)
-    if eval_match:
-        metadata['evaluation_id'] = int(eval_match.group(1))
-
-    # Extract prompt_id if present
-    prompt_match = re.search(r'Database prompt_id:\s*(\d+)', content)
-    if prompt_match:
-        metadata['prompt_id'] = int(prompt_match.group(1))
-
-    # Extract theme
-    theme_match = re.search(r'Theme:\s*(.+)', content)
-    if theme_match:
-        metadata['theme'] = theme_match.group(1).strip()
-
-    # Extract original prompt
-    original_match = re.search(r'Original Prompt:\s*(.+?)(?=\n\n=|$)', content, re.DOTALL)
+    # The id/theme fields are plain "Key: value" header lines - one
+    # splitlines pass over the part before the Original Prompt block picks
+    # them all up instead of three full-document regex scans
+    header = content.partition('Original Prompt:')[0]
+    for line in header.splitlines():
+        key, sep, value = line.partition(':')
+        if not sep:
+            continue
+        key = key.strip()
+        value = value.strip()
+        if key == 'Database evaluation_id' and value.isdigit():
+            metadata['evaluation_id'] = int(value)
+        elif key == 'Database prompt_id' and value.isdigit():
+            metadata['prompt_id'] = int(value)
+        elif key == 'Theme' and value:
+            metadata['theme'] = value
+
+    # Extract original prompt (free-form block, still needs the regex)
+    original_match = _META_ORIGINAL_RE.search(content)
     if original_match:
         metadata['original_prompt'] = original_match.group(1).strip()
 
@@ -128,7 +181,7 @@ def get_evaluation_id_from_db(db_manager, session_id: str, filename: str):
             
         # If exact match fails, try pattern matching for timestamped files
         # Extract theme and number from filename (e.g., wildlife_20250811_130401_01.txt -> wildlife_%_01.txt)
-        pattern_match = re.match(r'([^_]+)_\d{8}_\d{6}_(\d+)\.txt$', original_filename)
+        pattern_match = _FILE_PATTERN_RE.match(original_filename)
         if pattern_match:
             theme_part = pattern_match.group(1)
             number_part = pattern_match.group(2)
@@ -156,6 +209,88 @@ def get_evaluation_id_from_db(db_manager, session_id: str, filename: str):
         return None, None
 
 
+@functools.lru_cache(maxsize=None)
+def _ensure_dir(path_str):
+    """mkdir -p that runs at most once per directory per process.
+
+    The output folder is re-checked on every invocation when the module is
+    driven from the pipeline; caching on the path string skips the repeat
+    mkdir/stat syscalls.
+    """
+    Path(path_str).mkdir(parents=True, exist_ok=True)
+
+
+def _list_approved(path):
+    """
+    List approved_*.txt files in a directory with one os.scandir pass.
+
+    Path.glob compiles an fnmatch pattern and stats each candidate; a plain
+    prefix/suffix check on the scandir entries is a single readdir sweep.
+    Returns a sorted list of Paths so processing order is deterministic.
+    """
+    files = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith("approved_") and name.endswith(".txt") and entry.is_file():
+                    files.append(Path(entry.path))
+    except OSError:
+        return []
+    files.sort()
+    return files
+
+
+def _convert_one(file_path, output_path):
+    """Read one approved prompt, convert it, and write the generator file.
+
+    Pure file work only - database linking stays on the caller's thread so
+    SQLite keeps a single writer.
+    """
+    # Read as raw bytes and decode once - one read syscall of the whole
+    # payload instead of the TextIOWrapper's chunked incremental decode
+    detailed_prompt = file_path.read_bytes().decode('utf-8')
+
+    # Extract metadata from the approved file
+    metadata = extract_metadata_from_approved_file(detailed_prompt)
+
+    # Convert to generator format (extract clean prompt)
+    generator_prompt = convert_to_generator_format(detailed_prompt)
+
+    # Create output filename with unique identifier to prevent conflicts
+    # Convert approved_christmas_20250811_130401_01.txt -> generator_christmas_20250811130401_01.txt
+    base_name = file_path.name.replace("approved_", "")
+
+    # Extract timestamp pattern but keep it for uniqueness
+    timestamp_match = _TS_FN_RE.search(base_name)
+    if timestamp_match:
+        # Combine date and time into compact format: 20250811130401
+        compact_timestamp = f"{timestamp_match.group(1)}{timestamp_match.group(2)}"
+        # Remove the original timestamp pattern and replace with compact version
+        clean_name = _TS_FN_RE.sub(f'_{compact_timestamp}', base_name)
+    else:
+        # Fallback: use original name if no timestamp found
+        clean_name = base_name
+
+    generator_filename = f"generator_{clean_name}"
+    generator_path = output_path / generator_filename
+
+    # Save generator-optimized prompt - encode once and write the bytes
+    # directly, skipping the TextIOWrapper's incremental encoder layer
+    generator_path.write_bytes(generator_prompt.encode('utf-8'))
+
+    return detailed_prompt, metadata, generator_prompt, generator_filename, generator_path
+
+
+def _convert_one_safe(file_path, output_path):
+    """_convert_one wrapper that returns the exception instead of raising,
+    so one bad file does not abort the whole pool.map"""
+    try:
+        return _convert_one(file_path, output_path)
+    except Exception as e:
+        return e
+
+
 def process_approved_prompts_folder(input_folder="approved_prompts", output_folder="generator_prompts", session_id=None):
     """
     Process all approved prompt files and create generator-optimized versions with database integration
@@ -173,7 +308,7 @@ def process_approved_prompts_folder(input_folder="approved_prompts", output_fold
                 print(f"No approved_prompts folder found, trying database fallback...")
                 # Try to find from database as fallback
                 with DatabaseManager() as db:
-                    prompts = db.get_prompts_for_session(session_id)
+                    prompts = list(db.get_prompts_for_session(session_id))
                     if prompts:
                         # Get the directory from the first prompt's file path
                         first_prompt_path = Path(prompts[0]['file_path'])
@@ -201,30 +336,34 @@ def process_approved_prompts_folder(input_folder="approved_prompts", output_fold
         print(f"Input folder not found: {input_path}")
         print(f"Searching for approved prompts...")
         
-        # Try to find approved_prompts directories
+        # Try to find approved_prompts directories - one os.walk sweep with
+        # a single file count per candidate, instead of rglob plus a second
+        # glob per directory for the counts
         project_root = Path.cwd()
-        potential_dirs = list(project_root.rglob("approved_prompts"))
-        
-        if potential_dirs:
+        candidate_counts = {}
+        for dirpath, dirnames, _ in os.walk(project_root):
+            if "approved_prompts" in dirnames:
+                candidate = Path(dirpath) / "approved_prompts"
+                candidate_counts[candidate] = len(_list_approved(candidate))
+
+        if candidate_counts:
             print(f"[SEARCH] Found potential directories:")
-            for i, dir_path in enumerate(potential_dirs):
-                files = list(dir_path.glob("approved_*.txt"))
-                print(f"  {i+1}. {dir_path} ({len(files)} files)")
+            for i, (dir_path, count) in enumerate(candidate_counts.items()):
+                print(f"  {i+1}. {dir_path} ({count} files)")
 
-            if len(potential_dirs) == 1:
-                input_path = potential_dirs[0]
+            if len(candidate_counts) == 1:
+                input_path = next(iter(candidate_counts))
                 print(f"[OK] Auto-selected: {input_path}")
             else:
-                # Use the most recent one or one with most files
-                best_dir = max(potential_dirs, key=lambda d: len(list(d.glob("approved_*.txt"))))
-                input_path = best_dir
+                # Use the one with most files
+                input_path = max(candidate_counts, key=candidate_counts.get)
                 print(f"[OK] Auto-selected directory with most files: {input_path}")
-        
-        if not input_path.exists():
+        else:
+            # Nothing found - no need to re-stat the missing input path
             return False
 
     # Create output folder
-    output_path.mkdir(exist_ok=True)
+    _ensure_dir(str(output_path))
 
     # Initialize database connection first (needed for session filtering)
     db_manager = None
@@ -236,25 +375,46 @@ def process_approved_prompts_folder(input_folder="approved_prompts", output_fold
         print(f"Database connection failed: {e}")
         print("Will save to files only")
 
+    # A session manifest sidecar (written by prompt_judge) lists exactly
+    # the approved files for this session - trust it when present and skip
+    # the directory scan plus database/timestamp filtering entirely
+    manifest_loaded = False
+    all_prompt_files = []
+    if session_id:
+        manifest_file = input_path / f"{session_id}.manifest"
+        try:
+            names = manifest_file.read_text(encoding='utf-8').split()
+            manifest_files = sorted(
+                f for f in (input_path / name for name in names) if f.is_file())
+            if manifest_files:
+                all_prompt_files = manifest_files
+                manifest_loaded = True
+                print(f"DEBUG: Loaded {len(all_prompt_files)} approved files from session manifest")
+        except OSError:
+            pass
+
     # Find approved prompt files - filter by session if available
-    all_prompt_files = list(input_path.glob("approved_*.txt"))
-    print(f"DEBUG: Found {len(all_prompt_files)} total approved files")
-    
+    if not manifest_loaded:
+        all_prompt_files = _list_approved(input_path)
+        print(f"DEBUG: Found {len(all_prompt_files)} total approved files")
+
     # Filter files to current session only
-    prompt_files = []
-    if session_id and db_manager:
+    prompt_files = all_prompt_files if manifest_loaded else []
+    if not manifest_loaded and session_id and db_manager:
         try:
-            # Get original prompt files for this session from database
-            cursor = db_manager.connection.cursor()
-            cursor.execute("""
-                SELECT file_name FROM generated_prompts 
+            # Get original prompt files for this session from database,
+            # reusing the manager's cursor instead of allocating a new one
+            db_manager.cursor.execute("""
+                SELECT file_name FROM generated_prompts
                 WHERE session_id = ?
                 ORDER BY created_at
             """, (session_id,))
-            db_results = cursor.fetchall()
-            session_files_from_db = [f"approved_{row[0]}" for row in db_results]  # Add approved_ prefix
-            print(f"DEBUG: Expected approved files for session {session_id}: {session_files_from_db}")
-            
+            db_results = db_manager.cursor.fetchall()
+            # Add approved_ prefix; a set makes the per-file membership
+            # check below O(1) instead of a scan of the session list
+            session_files_from_db = {f"approved_{row[0]}" for row in db_results}
+            print(f"DEBUG: Expected approved files for session {session_id}: {sorted(session_files_from_db)}")
+
             # Filter actual files to match database records
             for file_path in all_prompt_files:
                 if file_path.name in session_files_from_db:
@@ -265,9 +425,8 @@ def process_approved_prompts_folder(input_folder="approved_prompts", output_fold
     
     # Fallback: Use timestamp-based filtering if database filtering failed
     if not prompt_files and session_id:
-        import re
         # Extract date from session_id (e.g., session_2025-08-15_16-40-08 -> 20250815)
-        session_date_match = re.search(r'session_(\d{4})-(\d{2})-(\d{2})', session_id)
+        session_date_match = _SESSION_DATE_RE.search(session_id)
         if session_date_match:
             year, month, day = session_date_match.groups()
             session_date = f"{year}{month}{day}"
@@ -288,7 +447,8 @@ def process_approved_prompts_folder(input_folder="approved_prompts", output_fold
     print(f"Processing {len(prompt_files)} prompts for generator optimization...")
     if len(prompt_files) != len(all_prompt_files):
         print(f"DEBUG: Filtered from {len(all_prompt_files)} total files to {len(prompt_files)} session files")
-        skipped_files = [f.name for f in all_prompt_files if f not in prompt_files]
+        prompt_files_set = set(prompt_files)
+        skipped_files = [f.name for f in all_prompt_files if f not in prompt_files_set]
         print(f"DEBUG: Skipped files: {skipped_files}")
     print(f"DEBUG: Processing files: {[f.name for f in prompt_files]}")
     print(f"Input: {input_path}")
@@ -300,71 +460,99 @@ def process_approved_prompts_folder(input_folder="approved_prompts", output_fold
     successful = 0
 
     try:
-        for file_path in prompt_files:
+        # Convert the files concurrently - each read/parse/write chain is
+        # independent, so the blocking file I/O runs in a small thread pool.
+        # Database linking stays on this thread below to keep SQLite
+        # single-writer.
+        with ThreadPoolExecutor(max_workers=min(_MAX_CONVERT_WORKERS, len(prompt_files))) as pool:
+            conversions = list(pool.map(
+                lambda file_path: _convert_one_safe(file_path, output_path),
+                prompt_files))
+
+        # Prefetch the evaluation and prompt ids for the whole session in
+        # two queries, instead of up to three point lookups per file below.
+        # Most-recent rows win (the queries are ordered DESC and setdefault
+        # keeps the first hit).
+        eval_map = {}
+        prompt_id_map = {}
+        if db_manager and session_id:
             try:
-                # Read the detailed prompt
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    detailed_prompt = f.read()
-
-                # Extract metadata from the approved file
-                metadata = extract_metadata_from_approved_file(detailed_prompt)
+                db_manager.cursor.execute("""
+                    SELECT gp.file_name, pe.evaluation_id, pe.prompt_id
+                    FROM prompt_evaluations pe
+                             JOIN generated_prompts gp ON pe.prompt_id = gp.prompt_id
+                    WHERE pe.session_id = ?
+                      AND pe.approved = TRUE
+                    ORDER BY pe.created_at DESC
+                """, (session_id,))
+                for row in db_manager.cursor.fetchall():
+                    eval_map.setdefault(row['file_name'], (row['evaluation_id'], row['prompt_id']))
+
+                db_manager.cursor.execute("""
+                    SELECT file_name, prompt_id FROM generated_prompts
+                    WHERE session_id = ?
+                    ORDER BY created_at DESC
+                """, (session_id,))
+                for row in db_manager.cursor.fetchall():
+                    prompt_id_map.setdefault(row['file_name'], row['prompt_id'])
+            except Exception as e:
+                print(f"WARNING: Could not prefetch evaluation ids: {e}")
+
+        # Per-file status lines are buffered and emitted in bulk - one
+        # stdout write per ~100 files instead of several per file, which
+        # matters when stdout is a piped/line-buffered console. Errors
+        # still print immediately.
+        status_lines = []
+
+        def _flush_status():
+            if status_lines:
+                sys.stdout.write('\n'.join(status_lines) + '\n')
+                status_lines.clear()
+
+        # One explicit transaction for the whole batch - every
+        # insert_reformatted_prompt below shares a single commit/fsync
+        # instead of paying one per row
+        txn = db_manager.transaction() if db_manager else nullcontext()
+        with txn:
+            for file_path, outcome in zip(prompt_files, conversions):
+                if isinstance(outcome, Exception):
+                    _flush_status()
+                    print(f"Error processing {file_path.name}: {outcome}")
+                    continue
+
+                detailed_prompt, metadata, generator_prompt, generator_filename, generator_path = outcome
 
                 # Get evaluation_id from database if not in file
                 evaluation_id = metadata.get('evaluation_id')
                 prompt_id = metadata.get('prompt_id')
 
                 if not evaluation_id and db_manager and session_id:
-                    evaluation_id, prompt_id = get_evaluation_id_from_db(db_manager, session_id, file_path.name)
-
-                # Convert to generator format (extract clean prompt)
-                generator_prompt = convert_to_generator_format(detailed_prompt)
-
-                # Create output filename with unique identifier to prevent conflicts
-                # Convert approved_christmas_20250811_130401_01.txt -> generator_christmas_20250811130401_01.txt
-                base_name = file_path.name.replace("approved_", "")
-                
-                # Extract timestamp pattern but keep it for uniqueness
-                import re
-                timestamp_match = re.search(r'_(\d{8})_(\d{6})', base_name)
-                if timestamp_match:
-                    # Combine date and time into compact format: 20250811130401
-                    date_part = timestamp_match.group(1)
-                    time_part = timestamp_match.group(2) 
-                    compact_timestamp = f"{date_part}{time_part}"
-                    # Remove the original timestamp pattern and replace with compact version
-                    clean_name = re.sub(r'_\d{8}_\d{6}', f'_{compact_timestamp}', base_name)
-                else:
-                    # Fallback: use original name if no timestamp found
-                    clean_name = base_name
-                
-                generator_filename = f"generator_{clean_name}"
-                generator_path = output_path / generator_filename
-
-                # Save generator-optimized prompt
-                with open(generator_path, 'w', encoding='utf-8') as f:
-                    f.write(generator_prompt)
-
-                print(f"Processing {file_path.name}")
-                print(f"   Length: {len(detailed_prompt)} -> {len(generator_prompt)} chars")
-                print(f"   Clean prompt: {generator_prompt}")
-                print(f"   Saved as: {generator_filename}")
+                    hit = eval_map.get(file_path.name.replace('approved_', ''))
+                    if hit:
+                        evaluation_id, prompt_id = hit
+                    else:
+                        # Not in the exact-name map - fall back to the LIKE
+                        # pattern lookup for timestamped filenames
+                        evaluation_id, prompt_id = get_evaluation_id_from_db(db_manager, session_id, file_path.name)
+
+                # Measure once and reuse for both the status line and the
+                # database insert (which otherwise re-walks both strings)
+                char_before = len(detailed_prompt)
+                char_after = len(generator_prompt)
+
+                status_lines.append(f"Processing {file_path.name}")
+                status_lines.append(f"   Length: {char_before} -> {char_after} chars")
+                status_lines.append(f"   Clean prompt: {generator_prompt}")
+                status_lines.append(f"   Saved as: {generator_filename}")
 
                 # Save to database if connected
                 if db_manager and session_id:
-                    # Try to get prompt_id from database if missing
+                    # Try to get prompt_id from the prefetched map if missing
                     if not prompt_id:
-                        original_filename = file_path.name.replace('approved_', '')
-                        cursor = db_manager.connection.cursor()
-                        cursor.execute("""
-                            SELECT prompt_id FROM generated_prompts 
-                            WHERE session_id = ? AND file_name = ?
-                            ORDER BY created_at DESC LIMIT 1
-                        """, (session_id, original_filename))
-                        result = cursor.fetchone()
-                        if result:
-                            prompt_id = result[0]
-                            print(f"   Found prompt_id from database: {prompt_id}")
-                    
+                        prompt_id = prompt_id_map.get(file_path.name.replace('approved_', ''))
+                        if prompt_id:
+                            status_lines.append(f"   Found prompt_id from database: {prompt_id}")
+
                     if prompt_id:
                         # Use evaluation_id if available, otherwise use 0 as placeholder
                         reformatted_id = db_manager.insert_reformatted_prompt(
@@ -374,21 +562,26 @@ def process_approved_prompts_folder(input_folder="approved_prompts", output_fold
                             original_detailed=detailed_prompt,
                             generator_optimized=generator_prompt,
                             file_name=generator_filename,
-                            file_path=str(generator_path)
+                            file_path=str(generator_path),
+                            char_before=char_before,
+                            char_after=char_after
                         )
 
                         if reformatted_id:
-                            print(f"   Saved to database: reformatted_id {reformatted_id}")
+                            status_lines.append(f"   Saved to database: reformatted_id {reformatted_id}")
                         else:
-                            print(f"   Database save failed")
+                            status_lines.append(f"   Database save failed")
                     else:
-                        print(f"   Could not find prompt_id for database linking")
+                        status_lines.append(f"   Could not find prompt_id for database linking")
 
-                print()
+                status_lines.append("")
                 successful += 1
 
-            except Exception as e:
-                print(f"Error processing {file_path.name}: {e}")
+                # Roughly every 100 files (a handful of lines per file)
+                if len(status_lines) >= 500:
+                    _flush_status()
+
+        _flush_status()
 
         print(f"{'=' * 60}")
         print(f"Successfully processed {successful}/{len(prompt_files)} files")
@@ -13,11 +13,58 @@ Classes:
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from types import MappingProxyType
 from typing import Dict, List, Optional, Any, Union
 import re
+import string
+import sys
+
+# Characters allowed in theme names, validated on every config
+# construction - a frozenset superset check is one C-level scan and
+# avoids spinning up the regex engine for a plain character-class test
+_THEME_NAME_CHARS = frozenset(string.ascii_lowercase + '_')
+
+# Hyperrealistic requirement terms, checked on every prompt evaluation.
+# A single compiled alternation finds all of them in one pass over the
+# text instead of one full substring scan per term
+_HR_TERMS = (
+    "hyperrealistic",
+    "8K resolution",
+    "ultra-detailed",
+    "professional photography",
+)
+_HR_RE = re.compile("|".join(re.escape(t.lower()) for t in _HR_TERMS))
+
+# Word tokenizer for the keyword fast path - most keywords appear as
+# whole words, so a set of tokens turns each check into a hash probe
+_TOKEN_RE = re.compile(r"[a-z0-9_-]+")
+
+# Enhancement markers probed by enhance_prompt - one scan over the lowered
+# prompt collects everything already present instead of a substring scan
+# (and often a fresh .lower()) per marker
+_ENH_PRESENCE_RE = re.compile(r'hyperrealistic|8k(?:\s+resolution)?|ultra-detailed|professional photography')
+
+
+# Default weights for standard themes - built once and returned read-only,
+# so themes without explicit weights stop allocating a dict per lookup
+_DEFAULT_WEIGHTS = MappingProxyType({
+    "word_count": 0.3,
+    "mandatory_keywords": 0.4,
+    "technical_accuracy": 0.3,
+})
+
+
+def _to_lower(s: str) -> str:
+    """Lowercase s, skipping the copy when it is already lowercase.
+
+    Machine-generated prompt text is usually lowercase already; islower()
+    is a single C-level pass with no allocation, so the common case costs
+    one scan instead of a scan plus a full string copy.
+    """
+    return s if s.islower() else s.lower()
 
 
-@dataclass
+@dataclass(slots=True)
 class LightingStyle:
     """
     Configuration for a specific lighting style within a theme.
@@ -46,7 +93,7 @@ class LightingStyle:
             raise ValueError("Lighting instructions must be comprehensive (50+ chars)")
 
 
-@dataclass
+@dataclass(slots=True)
 class ThemeConfig:
     """
     Complete configuration for a photography theme.
@@ -86,12 +133,28 @@ class ThemeConfig:
     example_scenarios: Optional[List[str]] = field(default_factory=list)
     realism_checklist: Optional[List[str]] = field(default_factory=list)
 
+    # Scoring weights rescaled to integer basis points (sum 10000) during
+    # validation, reused by the evaluation loop for exact integer math
+    _weights_bp: tuple = field(init=False, repr=False, default=())
+
+    # Advanced-theme flag, computed once - is_advanced_theme is called in
+    # the theme-selection loops, so it reduces to one attribute read
+    _is_advanced: bool = field(init=False, repr=False, default=False)
+
+    # Default lighting style resolved once; the per-enhancement lookup
+    # then skips the dict probe and iterator allocation
+    _default_style: Optional[LightingStyle] = field(init=False, repr=False, default=None)
+
+    # Theme instance memoized by get_theme so repeated lookups for the
+    # same config reuse one theme (and its compiled scan tables)
+    _theme_instance: Optional["BaseTheme"] = field(init=False, repr=False, default=None)
+
     def __post_init__(self):
         """Validate theme configuration"""
         if not self.name or not self.display_name:
             raise ValueError("Theme must have name and display_name")
 
-        if not re.match(r'^[a-z_]+$', self.name):
+        if not _THEME_NAME_CHARS.issuperset(self.name):
             raise ValueError("Theme name must be lowercase with underscores only")
 
         if len(self.theme_specific_notes) < 100:
@@ -105,9 +168,27 @@ class ThemeConfig:
             raise ValueError("min_words cannot be greater than max_words")
 
         if self.scoring_weights:
-            total_weight = sum(self.scoring_weights.values())
-            if abs(total_weight - 1.0) > 0.01:  # Allow small floating point errors
-                raise ValueError(f"Scoring weights must sum to 1.0, got {total_weight}")
+            # Rescale to integer basis points once - the sum check becomes
+            # exact integer arithmetic (10000 +/- 100 allows the same 1%
+            # tolerance as the old float comparison) and the cached tuple
+            # spares the evaluation loop the float re-derivation
+            bp = tuple((category, round(weight * 10000))
+                       for category, weight in self.scoring_weights.items())
+            if abs(sum(w for _, w in bp) - 10000) > 100:
+                raise ValueError(
+                    f"Scoring weights must sum to 1.0, got {sum(self.scoring_weights.values())}")
+            self._weights_bp = bp
+
+        self._default_style = (self.lighting_styles.get("default")
+                               or next(iter(self.lighting_styles.values())))
+
+        self._is_advanced = bool(
+            self.mandatory_keywords or
+            self.required_elements or
+            self.technical_requirements or
+            self.scoring_weights or
+            self.arrangement_types
+        )
 
     def get_lighting_style(self, style_name: str) -> Optional[LightingStyle]:
         """Get a specific lighting style by name"""
@@ -119,19 +200,11 @@ class ThemeConfig:
 
     def get_default_lighting_style(self) -> LightingStyle:
         """Get the default lighting style for this theme"""
-        if "default" in self.lighting_styles:
-            return self.lighting_styles["default"]
-        return next(iter(self.lighting_styles.values()))
+        return self._default_style
 
     def is_advanced_theme(self) -> bool:
         """Check if this is an advanced theme with complex validation"""
-        return bool(
-            self.mandatory_keywords or
-            self.required_elements or
-            self.technical_requirements or
-            self.scoring_weights or
-            self.arrangement_types
-        )
+        return self._is_advanced
 
     def get_word_count_range(self) -> tuple[int, int]:
         """Get the word count range for this theme"""
@@ -151,12 +224,129 @@ class ThemeConfig:
         """Get scoring weights, with defaults if not specified"""
         if self.scoring_weights:
             return self.scoring_weights
-        # Default weights for standard themes
-        return {
-            "word_count": 0.3,
-            "mandatory_keywords": 0.4,
-            "technical_accuracy": 0.3
-        }
+        return _DEFAULT_WEIGHTS
+
+
+@dataclass(frozen=True, slots=True)
+class _CompiledConfig:
+    """
+    Precomputed, immutable view of a ThemeConfig for the evaluation hot path.
+
+    A theme instance evaluates many prompts against one fixed config, so
+    the weights, word-count range, and forbidden-element scan are derived
+    once at construction instead of per call.
+    """
+    weights: tuple                      # ((category, weight_basis_points), ...)
+    word_range: tuple                   # (min_words, max_words)
+    forbidden_pairs: tuple              # ((original, lowercased), ...)
+    mandatory_pairs: tuple              # per group: ((original, lowercased), ...)
+    element_specs: tuple                # ((name, min_count, ((original, lowercased), ...)), ...)
+    master_re: Optional[re.Pattern]     # one alternation over every pattern of every kind
+    containment: dict                   # hit pattern -> other patterns nested inside it
+    score_template: dict                # constant detailed_scores entries for unused features
+
+
+def _lc_pairs(items) -> tuple:
+    """(original, interned lowercase) pairs for a list of keyword strings"""
+    return tuple((item, sys.intern(item.lower())) for item in items)
+
+
+def _compile_config(config: "ThemeConfig") -> _CompiledConfig:
+    """Derive the per-theme constants evaluate_prompt consults on every call"""
+    forbidden_pairs = _lc_pairs(config.forbidden_elements or ())
+
+    # Prefer the basis-point tuple cached during validation; themes without
+    # explicit weights rescale the defaults the same way
+    weights_bp = config._weights_bp or tuple(
+        (category, round(weight * 10000))
+        for category, weight in config.get_scoring_weights().items())
+
+    # The keyword strings never change after construction - lowercase (and
+    # intern) them once here instead of per keyword per evaluated prompt
+    mandatory_pairs = tuple(_lc_pairs(group) for group in (config.mandatory_keywords or ()))
+    element_specs = tuple(
+        (name, element_config.get("min_count", 1), _lc_pairs(element_config.get("any_of", [])))
+        for name, element_config in (config.required_elements or {}).items())
+
+    # Aho-Corasick-style master pattern: one alternation over every
+    # mandatory keyword, required-element item, and forbidden element, so
+    # evaluate_prompt discovers all hits of every kind in a single compiled
+    # scan. Longest-first so nested patterns are not shadowed by a shorter
+    # prefix at the same position.
+    all_lc = {lc for group in mandatory_pairs for _, lc in group}
+    all_lc.update(lc for _, lc in forbidden_pairs)
+    for _, _, pairs in element_specs:
+        all_lc.update(lc for _, lc in pairs)
+    master_re = None
+    containment = {}
+    if all_lc:
+        master_re = re.compile("|".join(
+            re.escape(lc) for lc in sorted(all_lc, key=len, reverse=True)))
+        # Patterns nested inside longer ones (e.g. "texture" in "textures")
+        # are shadowed by longest-first matching; map each pattern to its
+        # nested patterns once so hits expand with set updates instead of
+        # substring rescans of the prompt
+        for outer in all_lc:
+            nested = tuple(inner for inner in all_lc
+                           if inner != outer and inner in outer)
+            if nested:
+                containment[outer] = nested
+
+    # Specialize the evaluation for this config: features the theme does
+    # not use score a constant 1.0, so evaluate_prompt starts from this
+    # template and skips their branches entirely
+    score_template = {}
+    if not mandatory_pairs:
+        score_template["mandatory_keywords"] = 1.0
+    if not element_specs:
+        score_template["required_elements"] = 1.0
+
+    return _CompiledConfig(
+        weights=weights_bp,
+        word_range=config.get_word_count_range(),
+        forbidden_pairs=forbidden_pairs,
+        mandatory_pairs=mandatory_pairs,
+        element_specs=element_specs,
+        master_re=master_re,
+        containment=containment,
+        score_template=score_template,
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class GroupResult:
+    """Outcome of one mandatory-keyword group (OR within the group)"""
+    group_index: int
+    found: bool
+    keywords_found: tuple
+    keywords_required: tuple
+
+
+@dataclass(frozen=True, slots=True)
+class MandatoryResult:
+    """Outcome of the mandatory-keyword validation (AND between groups)"""
+    passed: bool
+    missing_groups: tuple
+    found_keywords: tuple
+    group_results: tuple
+
+
+@dataclass(frozen=True, slots=True)
+class ElementResult:
+    """Outcome of one required-element check"""
+    found_count: int
+    required_count: int
+    found_items: tuple
+    available_items: tuple
+    passed: bool
+
+
+@dataclass(frozen=True, slots=True)
+class ElementsResult:
+    """Outcome of the required-elements validation"""
+    passed: bool
+    element_results: Dict[str, ElementResult]
+    total_score: float
 
 
 class ValidationMixin:
@@ -174,23 +364,19 @@ class ValidationMixin:
                 raise ValueError(f"Required field '{field_name}' cannot be empty")
 
     @staticmethod
-    def validate_hyperrealistic_requirements(instructions: str) -> List[str]:
-        """Validate that instructions contain hyperrealistic requirements"""
-        required_terms = [
-            "hyperrealistic",
-            "8K resolution",
-            "ultra-detailed",
-            "professional photography"
-        ]
-
-        missing_terms = []
-        instructions_lower = instructions.lower()
-
-        for term in required_terms:
-            if term.lower() not in instructions_lower:
-                missing_terms.append(term)
-
-        return missing_terms
+    def validate_hyperrealistic_requirements(instructions: str,
+                                             instructions_lower: Optional[str] = None) -> List[str]:
+        """Validate that instructions contain hyperrealistic requirements.
+
+        Callers that already hold a lowercased copy can pass it as
+        instructions_lower to skip the re-lowering.
+        """
+        if instructions_lower is None:
+            instructions_lower = _to_lower(instructions)
+        # One alternation pass collects every term that is present; the
+        # missing list is the complement in the original casing
+        found = {m.group(0) for m in _HR_RE.finditer(instructions_lower)}
+        return [term for term in _HR_TERMS if term.lower() not in found]
 
     @staticmethod
     def validate_word_count_range(text: str, min_words: int = 50, max_words: int = 500) -> bool:
@@ -199,84 +385,119 @@ class ValidationMixin:
         return min_words <= word_count <= max_words
 
     @staticmethod
-    def validate_mandatory_keywords(text: str, mandatory_groups: List[List[str]]) -> Dict[str, Any]:
-        """Validate mandatory keywords with logical grouping (AND between groups, OR within groups)"""
-        text_lower = text.lower()
-        results = {
-            "passed": True,
-            "missing_groups": [],
-            "found_keywords": [],
-            "group_results": []
-        }
+    def validate_mandatory_keywords(text: str, mandatory_groups: List[List[str]],
+                                    text_lower: Optional[str] = None,
+                                    groups_lc: Optional[tuple] = None,
+                                    found_lc: Optional[set] = None) -> MandatoryResult:
+        """Validate mandatory keywords with logical grouping (AND between groups, OR within groups).
+
+        groups_lc may carry pre-lowercased (original, lowercase) pairs per
+        group (see _compile_config) to skip the per-keyword lowering, and
+        found_lc the hits from one combined alternation scan so present
+        keywords resolve without their own substring pass.
+        """
+        if text_lower is None:
+            text_lower = _to_lower(text)
+        if found_lc is None:
+            found_lc = ()
+
+        # Tokenize once: a whole-word keyword hit is then an O(1) set probe
+        # instead of an O(len(text)) substring scan. Keywords that miss the
+        # token set still fall back to the substring test, so partial-word
+        # matches behave exactly as before.
+        tokens = set(_TOKEN_RE.findall(text_lower))
+
+        passed = True
+        missing_groups = []
+        found_keywords = []
+        group_results = []
 
         for i, keyword_group in enumerate(mandatory_groups):
-            group_found = False
-            found_in_group = []
-
-            for keyword in keyword_group:
-                if keyword.lower() in text_lower:
-                    group_found = True
-                    found_in_group.append(keyword)
-                    results["found_keywords"].append(keyword)
-
-            results["group_results"].append({
-                "group_index": i,
-                "found": group_found,
-                "keywords_found": found_in_group,
-                "keywords_required": keyword_group
-            })
+            pairs = (groups_lc[i] if groups_lc is not None
+                     else [(keyword, keyword.lower()) for keyword in keyword_group])
+            found_in_group = tuple(
+                keyword for keyword, keyword_lower in pairs
+                if (keyword_lower in tokens or keyword_lower in found_lc
+                    or keyword_lower in text_lower))
+            group_found = bool(found_in_group)
+            found_keywords.extend(found_in_group)
+
+            group_results.append(GroupResult(
+                group_index=i,
+                found=group_found,
+                keywords_found=found_in_group,
+                keywords_required=tuple(keyword_group)
+            ))
 
             if not group_found:
-                results["passed"] = False
-                results["missing_groups"].append(i)
-
-        return results
+                passed = False
+                missing_groups.append(i)
+
+        return MandatoryResult(
+            passed=passed,
+            missing_groups=tuple(missing_groups),
+            found_keywords=tuple(found_keywords),
+            group_results=tuple(group_results)
+        )
 
     @staticmethod
-    def validate_required_elements(text: str, required_elements: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
-        """Validate required elements with complex validation rules"""
-        text_lower = text.lower()
-        results = {
-            "passed": True,
-            "element_results": {},
-            "total_score": 0.0
-        }
-
-        for element_name, element_config in required_elements.items():
-            any_of = element_config.get("any_of", [])
-            min_count = element_config.get("min_count", 1)
-
-            found_count = 0
-            found_items = []
-
-            for item in any_of:
-                if item.lower() in text_lower:
-                    found_count += 1
-                    found_items.append(item)
+    def validate_required_elements(text: str, required_elements: Dict[str, Dict[str, Any]],
+                                   text_lower: Optional[str] = None,
+                                   element_specs: Optional[tuple] = None,
+                                   found_lc: Optional[set] = None) -> ElementsResult:
+        """Validate required elements with complex validation rules.
+
+        element_specs may carry pre-lowercased (name, min_count, pairs)
+        tuples (see _compile_config) to skip the per-item lowering, and
+        found_lc the hits from one combined alternation scan so present
+        items resolve with a set lookup.
+        """
+        if text_lower is None:
+            text_lower = _to_lower(text)
+        if found_lc is None:
+            found_lc = ()
+        if element_specs is None:
+            element_specs = tuple(
+                (name, element_config.get("min_count", 1),
+                 [(item, item.lower()) for item in element_config.get("any_of", [])])
+                for name, element_config in required_elements.items())
+
+        passed = True
+        element_results = {}
+        total_score = 0.0
+
+        for element_name, min_count, pairs in element_specs:
+            found_items = tuple(
+                item for item, item_lower in pairs
+                if item_lower in found_lc or item_lower in text_lower)
+            found_count = len(found_items)
 
             element_passed = found_count >= min_count
 
-            results["element_results"][element_name] = {
-                "found_count": found_count,
-                "required_count": min_count,
-                "found_items": found_items,
-                "available_items": any_of,
-                "passed": element_passed
-            }
+            element_results[element_name] = ElementResult(
+                found_count=found_count,
+                required_count=min_count,
+                found_items=found_items,
+                available_items=tuple(item for item, _ in pairs),
+                passed=element_passed
+            )
 
             if not element_passed:
-                results["passed"] = False
+                passed = False
 
             # Score based on percentage of requirements met
             if min_count > 0:
-                element_score = min(1.0, found_count / min_count)
-                results["total_score"] += element_score
+                total_score += min(1.0, found_count / min_count)
 
         # Average score across all elements
         if required_elements:
-            results["total_score"] /= len(required_elements)
+            total_score /= len(required_elements)
 
-        return results
+        return ElementsResult(
+            passed=passed,
+            element_results=element_results,
+            total_score=total_score
+        )
 
 
 class BaseTheme(ABC, ValidationMixin):
@@ -291,6 +512,9 @@ class BaseTheme(ABC, ValidationMixin):
         """Initialize theme with validated configuration"""
         self.validate_config(config)
         self.config = config
+        # Compiled once per theme - evaluate_prompt reads this instead of
+        # re-deriving weights, ranges, and scan patterns per prompt
+        self._c = _compile_config(config)
 
     @abstractmethod
     def validate_config(self, config: ThemeConfig) -> None:
@@ -307,6 +531,18 @@ class BaseTheme(ABC, ValidationMixin):
         """Evaluate an enhanced prompt against this theme's criteria"""
         pass
 
+    def evaluate_prompts(self, enhanced_prompts: List[str],
+                         lighting_style: str = "default") -> List[Dict[str, Any]]:
+        """
+        Evaluate a batch of enhanced prompts against this theme's criteria.
+
+        The per-prompt work shares this theme's compiled config (weights,
+        scan patterns, keyword tables), so batching amortizes that setup
+        across the whole cohort; results come back in input order.
+        """
+        evaluate = self.evaluate_prompt
+        return [evaluate(prompt, lighting_style) for prompt in enhanced_prompts]
+
     def get_lighting_style(self, style_name: str) -> Optional[LightingStyle]:
         """Get lighting style configuration"""
         return self.config.get_lighting_style(style_name)
@@ -370,9 +606,18 @@ class AdvancedTheme(BaseTheme):
 
         enhanced = original_prompt
 
+        # One pass over the lowered prompt finds every marker that is
+        # already present; the branches below just test set membership
+        lowered = _to_lower(enhanced)
+        present = {m.group(0) for m in _ENH_PRESENCE_RE.finditer(lowered)}
+
         # Add hyperrealistic requirements if missing
-        if "hyperrealistic" not in enhanced.lower():
-            enhanced = f"Hyperrealistic photograph of {enhanced.lower()}"
+        if "hyperrealistic" not in present:
+            enhanced = f"Hyperrealistic photograph of {lowered}"
+
+        # Collect additions and join once at the end - repeated += on the
+        # growing prompt recopies the whole string per append
+        additions = []
 
         # Add technical requirements from technical_requirements if available
         if self.config.technical_requirements:
@@ -382,34 +627,63 @@ class AdvancedTheme(BaseTheme):
                     tech_reqs.extend(requirements[:1])  # Add one requirement from each category
 
             if tech_reqs:
-                enhanced += f", {', '.join(tech_reqs)}"
+                appended = ', '.join(tech_reqs)
+                additions.append(appended)
+                # The appended requirements may themselves carry markers
+                present.update(m.group(0) for m in _ENH_PRESENCE_RE.finditer(appended.lower()))
 
         # Apply lighting style instructions
         if lighting and lighting.lighting_instructions:
             # Extract key enhancement instructions
             instructions = lighting.lighting_instructions
-            if "8K resolution" in instructions and "8K" not in enhanced:
-                enhanced += ", 8K resolution"
-            if "ultra-detailed" in instructions and "ultra-detailed" not in enhanced.lower():
-                enhanced += ", ultra-detailed"
+            if "8K resolution" in instructions and not any(p.startswith("8k") for p in present):
+                additions.append("8K resolution")
+            if "ultra-detailed" in instructions and "ultra-detailed" not in present:
+                additions.append("ultra-detailed")
+
+        if additions:
+            enhanced = enhanced + ", " + ", ".join(additions)
 
         return enhanced
 
     def evaluate_prompt(self, enhanced_prompt: str, lighting_style: str = "default") -> Dict[str, Any]:
         """Evaluate prompt with advanced scoring system"""
+        # Hoist the compiled config into a local - the method body below
+        # reads it many times, and the score template pre-resolves the
+        # branches for features this theme does not use
+        c = self._c
         results = {
             "overall_score": 0.0,
-            "detailed_scores": {},
+            "detailed_scores": dict(c.score_template),
             "validation_results": {},
             "passed": False
         }
 
-        # Get scoring weights
-        weights = self.config.get_scoring_weights()
-
-        # Word count validation
-        min_words, max_words = self.config.get_word_count_range()
-        word_count = len(enhanced_prompt.split())
+        # Lowercase once up front - every validator below scans this same
+        # text, so one copy serves them all
+        prompt_lower = _to_lower(enhanced_prompt)
+
+        # One master scan finds every mandatory keyword, required element,
+        # and forbidden element present in the prompt; the validators below
+        # consume the hit set and only rescan on a miss
+        hits = set()
+        if c.master_re is not None:
+            hits = {m.group(0) for m in c.master_re.finditer(prompt_lower)}
+            # A hit implies its nested patterns occur too - expand from the
+            # precomputed containment map so the validators below resolve
+            # every present pattern with a plain set lookup
+            containment = c.containment
+            if containment:
+                for hit in tuple(hits):
+                    nested = containment.get(hit)
+                    if nested:
+                        hits.update(nested)
+
+        # Word count validation - the prompts are machine-generated and
+        # single-spaced, so counting separators replaces the split() list
+        # (one string object per word) with one C-level scan
+        min_words, max_words = c.word_range
+        word_count = enhanced_prompt.count(' ') + 1 if enhanced_prompt else 0
         word_score = 1.0 if min_words <= word_count <= max_words else 0.0
         results["detailed_scores"]["word_count"] = word_score
         results["validation_results"]["word_count"] = {
@@ -419,30 +693,29 @@ class AdvancedTheme(BaseTheme):
             "passed": word_score == 1.0
         }
 
-        # Mandatory keywords validation
-        if self.config.mandatory_keywords:
+        # Mandatory keywords validation - the master scan above already
+        # resolved present keywords, so only the per-group bookkeeping runs
+        if c.mandatory_pairs:
             keyword_results = self.validate_mandatory_keywords(
-                enhanced_prompt, self.config.mandatory_keywords
+                enhanced_prompt, self.config.mandatory_keywords, prompt_lower,
+                c.mandatory_pairs, hits
             )
-            keyword_score = 1.0 if keyword_results["passed"] else 0.0
+            keyword_score = 1.0 if keyword_results.passed else 0.0
             results["detailed_scores"]["mandatory_keywords"] = keyword_score
             results["validation_results"]["mandatory_keywords"] = keyword_results
-        else:
-            results["detailed_scores"]["mandatory_keywords"] = 1.0
 
         # Required elements validation
-        if self.config.required_elements:
+        if c.element_specs:
             elements_results = self.validate_required_elements(
-                enhanced_prompt, self.config.required_elements
+                enhanced_prompt, self.config.required_elements, prompt_lower,
+                c.element_specs, hits
             )
-            elements_score = elements_results["total_score"]
+            elements_score = elements_results.total_score
             results["detailed_scores"]["required_elements"] = elements_score
             results["validation_results"]["required_elements"] = elements_results
-        else:
-            results["detailed_scores"]["required_elements"] = 1.0
 
         # Technical accuracy (basic hyperrealistic terms check)
-        missing_terms = self.validate_hyperrealistic_requirements(enhanced_prompt)
+        missing_terms = self.validate_hyperrealistic_requirements(enhanced_prompt, prompt_lower)
         tech_score = 1.0 if not missing_terms else 0.5
         results["detailed_scores"]["technical_accuracy"] = tech_score
         results["validation_results"]["technical_accuracy"] = {
@@ -450,14 +723,15 @@ class AdvancedTheme(BaseTheme):
             "passed": len(missing_terms) == 0
         }
 
-        # Physical realism (basic check for forbidden elements)
+        # Physical realism (basic check for forbidden elements) - resolved
+        # from the master scan's hit set, falling back to an in-text scan
+        # like the validators above: finditer yields non-overlapping
+        # matches, so an occurrence that partially overlaps another hit
+        # never reaches the hit set
         forbidden_score = 1.0
-        if self.config.forbidden_elements:
-            found_forbidden = []
-            prompt_lower = enhanced_prompt.lower()
-            for forbidden in self.config.forbidden_elements:
-                if forbidden.lower() in prompt_lower:
-                    found_forbidden.append(forbidden)
+        if c.forbidden_pairs:
+            found_forbidden = [orig for orig, lc in c.forbidden_pairs
+                               if lc in hits or lc in prompt_lower]
 
             forbidden_score = 0.0 if found_forbidden else 1.0
             results["validation_results"]["physical_realism"] = {
@@ -467,11 +741,14 @@ class AdvancedTheme(BaseTheme):
 
         results["detailed_scores"]["physical_realism"] = forbidden_score
 
-        # Calculate weighted overall score
-        overall_score = 0.0
-        for category, weight in weights.items():
-            if category in results["detailed_scores"]:
-                overall_score += results["detailed_scores"][category] * weight
+        # Calculate weighted overall score from the basis-point weights -
+        # one float division at the end instead of a multiply per category
+        overall_bp = 0.0
+        detailed_scores = results["detailed_scores"]
+        for category, weight_bp in c.weights:
+            if category in detailed_scores:
+                overall_bp += detailed_scores[category] * weight_bp
+        overall_score = overall_bp / 10000.0
 
         results["overall_score"] = overall_score
         results["passed"] = overall_score >= 0.7  # Require 70% to pass
@@ -502,23 +779,30 @@ class DefaultTheme(BaseTheme):
         if not lighting:
             lighting = self.config.get_default_lighting_style()
 
+        # One pass over the lowered prompt finds every marker that is
+        # already present; the checks below are set lookups
+        lowered = _to_lower(original_prompt)
+        present = {m.group(0) for m in _ENH_PRESENCE_RE.finditer(lowered)}
+
         # Basic enhancement following hyperrealistic requirements
-        if "hyperrealistic" not in original_prompt.lower():
-            enhanced = f"Hyperrealistic photograph of {original_prompt.lower()}"
+        if "hyperrealistic" not in present:
+            enhanced = f"Hyperrealistic photograph of {lowered}"
         else:
             enhanced = original_prompt
 
-        # Add technical requirements if missing
+        # Add technical requirements if missing - build the tail once
+        # instead of recopying the prompt per appended term
         technical_terms = ["8K resolution", "ultra-detailed", "professional photography"]
-        for term in technical_terms:
-            if term.lower() not in enhanced.lower():
-                enhanced += f", {term}"
+        missing = [term for term in technical_terms if term.lower() not in present]
+        if missing:
+            enhanced = enhanced + ", " + ", ".join(missing)
 
         return enhanced
 
     def evaluate_prompt(self, enhanced_prompt: str, lighting_style: str = "default") -> Dict[str, Any]:
         """Evaluate prompt against general hyperrealistic criteria"""
-        word_count = len(enhanced_prompt.split())
+        # Separator count instead of split() - see AdvancedTheme.evaluate_prompt
+        word_count = enhanced_prompt.count(' ') + 1 if enhanced_prompt else 0
 
         # Check for required hyperrealistic elements
         missing_terms = self.validate_hyperrealistic_requirements(enhanced_prompt)
@@ -533,3 +817,21 @@ class DefaultTheme(BaseTheme):
             "meets_length_requirement": word_count >= self.config.minimum_word_count,
             "has_hyperrealistic_elements": len(missing_terms) == 0
         }
+
+
+def get_theme(config: ThemeConfig) -> BaseTheme:
+    """
+    Get the theme instance for a configuration, creating it on first use.
+
+    The instance is memoized on the config, so callers that resolve the
+    same ThemeConfig repeatedly share one theme object and its compiled
+    keyword tables instead of rebuilding them per lookup.
+    """
+    theme = config._theme_instance
+    if theme is None:
+        if config.is_advanced_theme():
+            theme = AdvancedTheme(config)
+        else:
+            theme = DefaultTheme(config)
+        config._theme_instance = theme
+    return theme
@@ -13,20 +13,79 @@ Functions:
     reload_theme: Force reload a theme from disk
 """
 
+import hashlib
+import mmap
 import os
+import re
 import sys
+import threading
 import yaml
 import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Union
 from functools import lru_cache
 import logging
 
-from .base_theme import BaseTheme, DefaultTheme, AdvancedTheme, ThemeConfig, LightingStyle
+from .base_theme import BaseTheme, DefaultTheme, AdvancedTheme, ThemeConfig, LightingStyle, get_theme
 
 # Setup logging (must be before first use)
 logger = logging.getLogger(__name__)
 
+# Use the libyaml-backed safe loader when the C extension is available -
+# same parse result as SafeLoader, roughly an order of magnitude faster
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Theme files at least this large are memory-mapped for parsing; below
+# it the mmap setup costs more than the read-buffer copy it avoids
+_MMAP_MIN_SIZE = 4096
+
+# Allowed theme names: alphanumerics, underscore, hyphen, 1-100 chars.
+# One compiled-regex pass covers what used to be four substring scans
+# (traversal sequences, null bytes) plus a separate length check
+_THEME_NAME_RE = re.compile(r'\A[A-Za-z0-9_\-]{1,100}\Z')
+
+# Legacy lighting style names mapped onto their current equivalents,
+# pre-applied when the lighting index is built so old callers resolve
+# with the same single dict lookup as new ones
+_LIGHTING_STYLE_ALIASES = {
+    "autumn": "documentary",
+    "summer": "bright_sunny",
+    "hyperreal_standard": "default"
+}
+
+# Advanced theme fields (Edge-of-Frame and similar complex themes)
+# forwarded verbatim from YAML to ThemeConfig. Collected in one
+# membership pass so simple themes skip a dict lookup - and a throwaway
+# default [] / {} - per absent field
+_ADVANCED_FIELDS = (
+    'min_words',
+    'max_words',
+    'mandatory_keywords',
+    'required_elements',
+    'technical_requirements',
+    'forbidden_elements',
+    'scoring_weights',
+    'physics_requirements',
+    'arrangement_types',
+    'authenticity_guidelines',
+    'detail_emphasis',
+    'specific_prompts',
+    'example_scenarios',
+    'realism_checklist',
+)
+
+# Fallback style shared by every theme that defines no lighting styles
+# of its own. Built once so such parses skip the per-call construction;
+# treat it as immutable - it is referenced from many configs
+_DEFAULT_LIGHTING_STYLE = LightingStyle(
+    name="Default Style",
+    description="Standard hyperrealistic photography",
+    lighting_instructions="Enhance with hyperrealistic details, 8K resolution, professional photography quality.",
+    evaluation_criteria="Must include hyperrealistic elements and detailed descriptions."
+)
+
 # Add database path for mixed theme support
 current_dir = Path(__file__).parent
 database_dir = current_dir.parent.parent / "database"
@@ -53,6 +112,74 @@ except ImportError:
     MIXED_THEMES_SUPPORTED = False
 
 
+class _LRUCache:
+    """
+    Small least-recently-used cache backed by an OrderedDict.
+
+    Bounds the registry caches so long-running processes don't accumulate
+    every theme ever touched: lookups refresh recency, inserts beyond
+    maxsize evict the least recently used entry, and hit/miss counters
+    expose cache efficacy via ThemeRegistry.cache_stats().
+
+    Every operation is a multi-step mutation of the OrderedDict (get
+    touches recency, put may evict), so a lock serializes them - needed
+    for preload_all's worker threads putting under eviction pressure.
+    """
+
+    __slots__ = ('maxsize', 'hits', 'misses', '_data', '_lock')
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Any, value: Any) -> None:
+        """Insert or refresh an entry, evicting the oldest if over maxsize."""
+        with self._lock:
+            data = self._data
+            data[key] = value
+            data.move_to_end(key)
+            if len(data) > self.maxsize:
+                data.popitem(last=False)
+
+    def pop(self, key: Any) -> None:
+        """Remove an entry if present"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept for lifetime stats)"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current occupancy"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+
 class ThemeRegistry:
     """
     Central registry for theme loading, caching, and management.
@@ -64,13 +191,14 @@ class ThemeRegistry:
     - Auto-discovery of available themes
     """
 
-    def __init__(self, definitions_dir: Optional[Path] = None):
+    def __init__(self, definitions_dir: Optional[Path] = None, cache_size: int = 128):
         """
         Initialize the theme registry.
 
         Args:
             definitions_dir: Directory containing theme YAML files.
                            If None, uses the default definitions directory.
+            cache_size: Maximum entries held in the theme and config caches.
         """
         if definitions_dir is None:
             # Default to definitions directory relative to this file
@@ -78,8 +206,20 @@ class ThemeRegistry:
             definitions_dir = current_dir / "definitions"
 
         self.definitions_dir = Path(definitions_dir)
-        self._theme_cache: Dict[str, BaseTheme] = {}
-        self._config_cache: Dict[str, ThemeConfig] = {}
+        self._theme_cache: _LRUCache = _LRUCache(cache_size)
+        self._config_cache: _LRUCache = _LRUCache(cache_size)
+        # Content-addressed parse cache keyed on (theme name, digest of
+        # the raw bytes) - unlike the name-keyed config cache it survives
+        # reload_theme, so reloading an unchanged file costs one hash
+        # pass instead of a YAML parse
+        self._content_cache: _LRUCache = _LRUCache(cache_size)
+        # (directory mtime_ns, theme names) - listing is re-derived only
+        # when the definitions directory actually changes
+        self._list_cache: Optional[tuple] = None
+        # Inverted index {lighting_style_name: LightingStyle} across all
+        # themes, built lazily so one style lookup costs a dict probe
+        # instead of a YAML parse per available theme
+        self._lighting_index: Optional[Dict[str, LightingStyle]] = None
 
         # Initialize database manager for mixed theme support
         self.db_manager = None
@@ -90,7 +230,8 @@ class ThemeRegistry:
             except Exception as e:
                 logger.warning(f"Mixed theme support disabled, database connection failed: {e}")
 
-        # Ensure definitions directory exists
+        # Ensure definitions directory exists - verified once here so the
+        # listing and existence checks can skip a per-call directory stat
         if not self.definitions_dir.exists():
             logger.warning(f"Theme definitions directory not found: {self.definitions_dir}")
             self.definitions_dir.mkdir(parents=True, exist_ok=True)
@@ -102,14 +243,24 @@ class ThemeRegistry:
         Returns:
             List of theme names (without .yaml extension)
         """
-        themes = []
-
-        # Get regular themes from YAML files
-        if self.definitions_dir.exists():
-            theme_files = self.definitions_dir.glob("*.yaml")
-            themes.extend([f.stem for f in theme_files if f.is_file()])
-
-        return list(set(themes))  # Remove duplicates
+        # Get regular themes from YAML files - the directory mtime guards
+        # a cached listing, so steady-state calls cost one stat instead of
+        # a full glob with a stat per entry. The directory itself was
+        # created in __init__, so no existence check is needed here.
+        dir_mtime = os.stat(self.definitions_dir).st_mtime_ns
+        if self._list_cache is not None and self._list_cache[0] == dir_mtime:
+            return list(self._list_cache[1])
+
+        # scandir reports the entry type from the directory read itself,
+        # so the file check needs no extra stat per entry
+        with os.scandir(self.definitions_dir) as entries:
+            themes = [entry.name[:-5] for entry in entries
+                      if entry.name.endswith('.yaml')
+                      and entry.is_file(follow_symlinks=False)]
+        themes = list(set(themes))  # Remove duplicates
+        self._list_cache = (dir_mtime, tuple(themes))
+
+        return themes
 
     def _validate_theme_name(self, theme_name: str) -> bool:
         """
@@ -121,27 +272,14 @@ class ThemeRegistry:
         Returns:
             True if valid, False if suspicious
         """
-        # Theme names should only contain alphanumeric, underscore, and hyphen
-        if not theme_name:
-            logger.warning("Empty theme name rejected")
-            return False
+        # Theme names should only contain alphanumeric, underscore, and
+        # hyphen - anything else (traversal sequences, separators, null
+        # bytes, over-long names) fails the single anchored-regex match
+        if _THEME_NAME_RE.match(theme_name):
+            return True
 
-        # Check for path traversal attempts
-        if '..' in theme_name or '/' in theme_name or '\\' in theme_name:
-            logger.warning(f"[SECURITY WARNING] Path traversal attempt in theme name: {theme_name}")
-            return False
-
-        # Check for null bytes
-        if '\x00' in theme_name:
-            logger.warning(f"[SECURITY WARNING] Null byte in theme name: {theme_name}")
-            return False
-
-        # Reasonable length check
-        if len(theme_name) > 100:
-            logger.warning(f"[SECURITY WARNING] Theme name too long: {len(theme_name)} chars")
-            return False
-
-        return True
+        logger.warning(f"[SECURITY WARNING] Invalid theme name rejected: {theme_name!r}")
+        return False
 
     def theme_exists(self, theme_name: str) -> bool:
         """Check if a theme definition file exists"""
@@ -160,7 +298,9 @@ class ThemeRegistry:
                 return False
             theme_file = safe_path
 
-        return theme_file.exists()
+        # os.path.isfile resolves the check with one stat and no Path
+        # object machinery on the hot path
+        return os.path.isfile(str(theme_file))
 
     def load_theme_config(self, theme_name: str, use_cache: bool = True) -> ThemeConfig:
         """
@@ -183,8 +323,10 @@ class ThemeRegistry:
             raise ValueError(f"Invalid theme name: {theme_name}")
 
         # Check cache first
-        if use_cache and theme_name in self._config_cache:
-            return self._config_cache[theme_name]
+        if use_cache:
+            cached = self._config_cache.get(theme_name)
+            if cached is not None:
+                return cached
 
         # Check if there's a YAML file
         theme_file = self.definitions_dir / f"{theme_name}.yaml"
@@ -197,19 +339,49 @@ class ThemeRegistry:
             theme_file = safe_path
 
         if theme_file.exists():
-            # Load from YAML file
-            with open(theme_file, 'r', encoding='utf-8') as f:
-                config_data = yaml.safe_load(f)
+            # Load from YAML file - bytes go straight to the loader, which
+            # handles the UTF-8 decode itself (in C with CSafeLoader).
+            # Larger files are memory-mapped so the parser consumes the
+            # page cache directly instead of a copied read buffer
+            with open(theme_file, 'rb') as f:
+                if os.fstat(f.fileno()).st_size >= _MMAP_MIN_SIZE:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        config = self._parse_config_bytes(theme_name, mm)
+                else:
+                    config = self._parse_config_bytes(theme_name, f.read())
 
-            config = self._parse_theme_config(config_data, theme_name)
             if use_cache:
-                self._config_cache[theme_name] = config
+                self._config_cache.put(theme_name, config)
             logger.info(f"Loaded theme configuration from YAML: {theme_name}")
             return config
 
         # If we get here, theme file doesn't exist
         raise FileNotFoundError(f"Theme definition not found: {theme_name}")
 
+    def _parse_config_bytes(self, theme_name: str, data: Union[bytes, mmap.mmap]) -> ThemeConfig:
+        """
+        Parse raw YAML bytes, reusing the parse when the content is unchanged.
+
+        Hashing is memory-bandwidth-bound while YAML parsing is
+        compute-bound, so when the bytes match a previous load of the same
+        theme the parsed config is served for the cost of one blake2b pass.
+        This is what makes prophylactic reload_theme calls on unchanged
+        files cheap.
+
+        Args:
+            theme_name: Name of the theme being loaded
+            data: Raw file contents (bytes or a read-only mmap)
+
+        Returns:
+            ThemeConfig parsed from the bytes (possibly cached)
+        """
+        key = (theme_name, hashlib.blake2b(data, digest_size=16).digest())
+        config = self._content_cache.get(key)
+        if config is None:
+            config = self._parse_theme_config(yaml.load(data, Loader=_YAML_LOADER), theme_name)
+            self._content_cache.put(key, config)
+        return config
+
     def _parse_theme_config(self, yaml_data: Dict[str, Any], theme_name: str) -> ThemeConfig:
         """Parse YAML data into ThemeConfig object"""
 
@@ -234,36 +406,20 @@ class ThemeRegistry:
             )
             lighting_styles[style_name] = lighting_style
 
-        # If no lighting styles defined, create a default one
+        # If no lighting styles defined, fall back to the shared default
         if not lighting_styles:
-            default_style = LightingStyle(
-                name="Default Style",
-                description="Standard hyperrealistic photography",
-                lighting_instructions="Enhance with hyperrealistic details, 8K resolution, professional photography quality.",
-                evaluation_criteria="Must include hyperrealistic elements and detailed descriptions."
-            )
-            lighting_styles['default'] = default_style
+            lighting_styles['default'] = _DEFAULT_LIGHTING_STYLE
 
         # Parse other configuration
         evaluation_criteria = yaml_data.get('evaluation_criteria', {})
         keywords = yaml_data.get('keywords', [])
         minimum_word_count = yaml_data.get('minimum_word_count', 60)
 
-        # Parse advanced theme features (for Edge-of-Frame and similar complex themes)
-        min_words = yaml_data.get('min_words')
-        max_words = yaml_data.get('max_words')
-        mandatory_keywords = yaml_data.get('mandatory_keywords', [])
-        required_elements = yaml_data.get('required_elements', {})
-        technical_requirements = yaml_data.get('technical_requirements', {})
-        forbidden_elements = yaml_data.get('forbidden_elements', [])
-        scoring_weights = yaml_data.get('scoring_weights', {})
-        physics_requirements = yaml_data.get('physics_requirements', [])
-        arrangement_types = yaml_data.get('arrangement_types', {})
-        authenticity_guidelines = yaml_data.get('authenticity_guidelines', [])
-        detail_emphasis = yaml_data.get('detail_emphasis', [])
-        specific_prompts = yaml_data.get('specific_prompts', [])
-        example_scenarios = yaml_data.get('example_scenarios', [])
-        realism_checklist = yaml_data.get('realism_checklist', [])
+        # Advanced theme features are forwarded only when present, so
+        # simple themes fall through to the dataclass defaults without
+        # materializing a default value per absent field
+        advanced = {field_name: yaml_data[field_name]
+                    for field_name in _ADVANCED_FIELDS if field_name in yaml_data}
 
         return ThemeConfig(
             name=name,
@@ -274,21 +430,7 @@ class ThemeRegistry:
             evaluation_criteria=evaluation_criteria,
             keywords=keywords,
             minimum_word_count=minimum_word_count,
-            # Advanced features
-            min_words=min_words,
-            max_words=max_words,
-            mandatory_keywords=mandatory_keywords,
-            required_elements=required_elements,
-            technical_requirements=technical_requirements,
-            forbidden_elements=forbidden_elements,
-            scoring_weights=scoring_weights,
-            physics_requirements=physics_requirements,
-            arrangement_types=arrangement_types,
-            authenticity_guidelines=authenticity_guidelines,
-            detail_emphasis=detail_emphasis,
-            specific_prompts=specific_prompts,
-            example_scenarios=example_scenarios,
-            realism_checklist=realism_checklist
+            **advanced
         )
 
     def load_theme(self, theme_name: str, use_cache: bool = True) -> BaseTheme:
@@ -307,27 +449,100 @@ class ThemeRegistry:
             ValueError: If theme configuration is invalid
         """
         # Check cache first
-        if use_cache and theme_name in self._theme_cache:
-            return self._theme_cache[theme_name]
+        if use_cache:
+            cached = self._theme_cache.get(theme_name)
+            if cached is not None:
+                return cached
 
         # Load configuration
         config = self.load_theme_config(theme_name, use_cache)
 
-        # Create theme instance - use AdvancedTheme for complex themes
+        # Create theme instance - get_theme picks AdvancedTheme for complex
+        # themes and memoizes the instance on the config, so a cached
+        # config never rebuilds its theme
+        theme = get_theme(config)
         if config.is_advanced_theme():
-            theme = AdvancedTheme(config)
             logger.info(f"Created advanced theme instance for: {theme_name}")
         else:
-            theme = DefaultTheme(config)
             logger.info(f"Created default theme instance for: {theme_name}")
 
         # Cache the theme
         if use_cache:
-            self._theme_cache[theme_name] = theme
+            self._theme_cache.put(theme_name, theme)
 
         logger.info(f"Loaded theme instance: {theme_name}")
         return theme
 
+    def preload_all(self, max_workers: int = 8) -> None:
+        """
+        Warm the config cache by loading every available theme in parallel.
+
+        File reads block on disk I/O and the C-backed YAML loader releases
+        the GIL during its parse, so a small thread pool overlaps the
+        loads - wall clock tracks the slowest single theme instead of the
+        sum of all of them. Failed loads are logged and skipped, matching
+        lookup-time behaviour. Cache writes land in the LRU caches, whose
+        operations are serialized by their own lock, so concurrent worker
+        puts are safe even under eviction pressure.
+
+        Args:
+            max_workers: Upper bound on concurrent theme loads
+        """
+        theme_names = self.list_available_themes()
+        if not theme_names:
+            return
+
+        def _load(theme_name: str) -> None:
+            try:
+                self.load_theme_config(theme_name)
+            except Exception as e:
+                logger.warning(f"Preload failed for theme {theme_name}: {e}")
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(theme_names))) as pool:
+            for _ in pool.map(_load, theme_names):
+                pass
+
+        logger.info(f"Preloaded {len(theme_names)} theme configurations")
+
+    def _ensure_lighting_index(self) -> Dict[str, LightingStyle]:
+        """
+        Build the inverted lighting-style index on first use.
+
+        Walks every available theme once, merging each config's lighting
+        styles into a single dict (first theme wins on name collisions,
+        matching the old linear-scan order) and pre-resolving the legacy
+        style aliases. Subsequent lookups are a single dict probe.
+        """
+        if self._lighting_index is None:
+            index: Dict[str, LightingStyle] = {}
+            for theme_name in self.list_available_themes():
+                try:
+                    config = self.load_theme_config(theme_name)
+                except Exception:
+                    continue
+                for style_name, style in config.lighting_styles.items():
+                    index.setdefault(style_name, style)
+
+            for alias, target in _LIGHTING_STYLE_ALIASES.items():
+                if alias not in index and target in index:
+                    index[alias] = index[target]
+
+            self._lighting_index = index
+
+        return self._lighting_index
+
+    def get_lighting_style(self, lighting_style: str) -> Optional[LightingStyle]:
+        """
+        Look up a lighting style by name across all available themes.
+
+        Args:
+            lighting_style: Name of the lighting style (legacy aliases ok)
+
+        Returns:
+            LightingStyle if found in any theme, None otherwise
+        """
+        return self._ensure_lighting_index().get(lighting_style)
+
     def reload_theme(self, theme_name: str) -> BaseTheme:
         """
         Force reload a theme from disk, bypassing cache.
@@ -339,8 +554,16 @@ class ThemeRegistry:
             Fresh BaseTheme instance
         """
         # Clear from caches
-        self._theme_cache.pop(theme_name, None)
-        self._config_cache.pop(theme_name, None)
+        self._theme_cache.pop(theme_name)
+        self._config_cache.pop(theme_name)
+        self._list_cache = None
+        self._lighting_index = None
+
+        # The module-level backward-compatibility wrappers memoize their
+        # results too - purge them so a forced reload is visible through
+        # every API, matching clear_theme_cache
+        get_theme_config.cache_clear()
+        get_lighting_config.cache_clear()
 
         # Load fresh from disk
         return self.load_theme(theme_name, use_cache=False)
@@ -349,8 +572,24 @@ class ThemeRegistry:
         """Clear all cached themes and configurations"""
         self._theme_cache.clear()
         self._config_cache.clear()
+        self._content_cache.clear()
+        self._list_cache = None
+        self._lighting_index = None
         logger.info("Theme cache cleared")
 
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get hit/miss statistics for the registry caches.
+
+        Returns:
+            Dict with per-cache counters (hits, misses, size, maxsize)
+        """
+        return {
+            "themes": self._theme_cache.stats(),
+            "configs": self._config_cache.stats(),
+            "content": self._content_cache.stats(),
+        }
+
     def validate_theme(self, theme_name: str) -> Dict[str, Any]:
         """
         Validate a theme configuration without loading it.
@@ -397,6 +636,10 @@ def get_registry() -> ThemeRegistry:
     global _global_registry
     if _global_registry is None:
         _global_registry = ThemeRegistry()
+        # Opt-in parallel warmup for deployments that touch every theme
+        # early (lighting lookups, backward-compatibility tables)
+        if os.environ.get('PRELOAD_THEMES'):
+            _global_registry.preload_all()
     return _global_registry
 
 
@@ -466,9 +709,12 @@ def validate_theme(theme_name: str) -> Dict[str, Any]:
 def clear_theme_cache() -> None:
     """Clear all cached themes"""
     get_registry().clear_cache()
+    get_theme_config.cache_clear()
+    get_lighting_config.cache_clear()
 
 
 # Backward compatibility function for the existing codebase
+@lru_cache(maxsize=None)
 def get_theme_config(theme_name: str) -> Dict[str, Any]:
     """
     Get theme configuration in the original format for backward compatibility.
@@ -503,6 +749,7 @@ def get_theme_config(theme_name: str) -> Dict[str, Any]:
         }
 
 
+@lru_cache(maxsize=None)
 def get_lighting_config(lighting_style: str) -> Dict[str, Any]:
     """
     Get lighting configuration in original format for backward compatibility.
@@ -513,42 +760,17 @@ def get_lighting_config(lighting_style: str) -> Dict[str, Any]:
     Returns:
         Dict in original LIGHTING_STYLES format
     """
-    # For backward compatibility, map old lighting style names to defaults
-    lighting_mapping = {
-        "autumn": "documentary",
-        "summer": "bright_sunny",
-        "hyperreal_standard": "default"
-    }
-
-    # Try to find the lighting style in any available theme
-    for theme_name in list_available_themes():
-        try:
-            config = get_registry().load_theme_config(theme_name)
-
-            # Check direct match first
-            if lighting_style in config.lighting_styles:
-                style = config.lighting_styles[lighting_style]
-                return {
-                    "style_name": style.name,
-                    "lighting_description": style.description,
-                    "lighting_instructions": style.lighting_instructions,
-                    "evaluation_criteria": style.evaluation_criteria,
-                    "color_palette": style.color_palette or "natural colors"
-                }
-
-            # Check mapped name
-            mapped_name = lighting_mapping.get(lighting_style)
-            if mapped_name and mapped_name in config.lighting_styles:
-                style = config.lighting_styles[mapped_name]
-                return {
-                    "style_name": style.name,
-                    "lighting_description": style.description,
-                    "lighting_instructions": style.lighting_instructions,
-                    "evaluation_criteria": style.evaluation_criteria,
-                    "color_palette": style.color_palette or "natural colors"
-                }
-        except Exception:
-            continue
+    # The registry's inverted index resolves the style (legacy aliases
+    # included) with one dict lookup instead of a YAML parse per theme
+    style = get_registry().get_lighting_style(lighting_style)
+    if style is not None:
+        return {
+            "style_name": style.name,
+            "lighting_description": style.description,
+            "lighting_instructions": style.lighting_instructions,
+            "evaluation_criteria": style.evaluation_criteria,
+            "color_palette": style.color_palette or "natural colors"
+        }
 
     # Default fallback
     return {
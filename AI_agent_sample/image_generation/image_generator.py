@@ -216,18 +216,12 @@ def generate_image(prompt: str, db_manager=None, image_id=None) -> str:
 
         print(f"[STARTED] Image generation started: {task_id}")
 
-        # Update database with task_id and API response
+        # Update database with task_id and API response (the raw payload
+        # lands in the side table, keeping generated_images rows narrow)
         if db_manager and image_id:
             try:
-                query = """
-                        UPDATE generated_images
-                        SET generator_task_id = ?,
-                            api_response = ?
-                        WHERE image_id = ?
-                        """
                 api_response = {"prediction_id": task_id, "model": "black-forest-labs/flux-krea-dev", "status": "started"}
-                db_manager.cursor.execute(query, (task_id, str(api_response), image_id))
-                db_manager.connection.commit()
+                db_manager.set_image_task_id(image_id, task_id, api_response)
                 print(f"[DATABASE] Updated database with prediction_id: {task_id}")
             except Exception as e:
                 print(f"WARNING: Failed to update database with task_id: {e}")